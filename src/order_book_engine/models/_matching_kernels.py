@@ -0,0 +1,71 @@
+"""
+Quantity kernels used to consume the resting orders of a price level.
+
+The kernels operate on the contiguous quantity array of an ``OrderQueue`` and never
+touch ``Order`` objects, so the whole walk over a level happens in one call. When
+numba is installed the loop kernel is compiled in nopython mode and cached on disk
+next to this module, so only the first process that imports it pays for compilation.
+Otherwise a NumPy implementation with the same contract is used.
+"""
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is an optional accelerator, see the ``jit`` extra
+    njit = None
+
+
+def _get_qty_loop(qty: np.ndarray, head: int, tail: int, requested_quantity: int) -> Tuple[int, int, int]:
+    """
+    Walks the live slice ``qty[head:tail]`` filling orders until the requested quantity is
+    satisfied or the slice is exhausted. The order left at the new head is partially filled
+    in place when the requested quantity ends inside it.
+
+    :param qty: Quantities of the queued orders.
+    :type qty: np.ndarray
+    :param head: Index of the first live order.
+    :type head: int
+    :param tail: Index one past the last live order.
+    :type tail: int
+    :param requested_quantity: The quantity to fill.
+    :type requested_quantity: int
+    :return: A tuple containing the new head index, the quantity taken from the partially
+        filled order (0 if none), and the quantity that could not be filled.
+    :rtype: Tuple[int, int, int]
+    """
+    remaining_qty = requested_quantity
+    index = head
+    while remaining_qty > 0 and index < tail:
+        if qty[index] <= remaining_qty:
+            remaining_qty -= qty[index]
+            index += 1
+        else:
+            qty[index] -= remaining_qty
+            return index, remaining_qty, 0
+    return index, 0, remaining_qty
+
+
+def _get_qty_vectorized(qty: np.ndarray, head: int, tail: int, requested_quantity: int) -> Tuple[int, int, int]:
+    """
+    NumPy equivalent of `_get_qty_loop`, used when numba is not installed. The cumulative sum
+    of the live quantities is searched for the requested quantity, which yields the number of
+    fully filled orders in a single vectorized pass.
+
+    :return: A tuple containing the new head index, the quantity taken from the partially
+        filled order (0 if none), and the quantity that could not be filled.
+    :rtype: Tuple[int, int, int]
+    """
+    cumulative = np.cumsum(qty[head:tail])
+    filled_count = int(np.searchsorted(cumulative, requested_quantity, side="right"))
+    remaining_qty = requested_quantity - (int(cumulative[filled_count - 1]) if filled_count else 0)
+    new_head = head + filled_count
+    if remaining_qty > 0 and new_head < tail:
+        qty[new_head] -= remaining_qty
+        return new_head, remaining_qty, 0
+    return new_head, 0, remaining_qty
+
+
+# Compiled once and cached on disk when numba is available
+_get_qty_kernel = njit(cache=True)(_get_qty_loop) if njit is not None else _get_qty_vectorized
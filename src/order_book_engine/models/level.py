@@ -1,8 +1,241 @@
-from collections import deque
-from copy import deepcopy
-from typing import Tuple, List, Optional
+from dataclasses import replace
+from typing import Tuple, List, Optional, Iterator
 
-from ..models.order import Order, Position, OrderSide
+import numpy as np
+
+from ..models.order import Order, Position, LONG
+from ._matching_kernels import _get_qty_kernel
+
+
+class OrderQueue:
+    """
+    FIFO queue of resting orders stored as a structure of arrays.
+
+    Quantities live in a contiguous ``int64`` array next to a preallocated list holding
+    the ``Order`` instances, and a ``head``/``tail`` index pair marks the live slice.
+    Appending writes at ``tail`` and consuming orders only advances ``head``, so the
+    quantities of the queue can be scanned with a single kernel call instead of popping
+    the orders one by one. The live slice is never wrapped around the end of the buffers,
+    which keeps it contiguous for the kernel; it is moved back to the front instead.
+
+    Cancelling an order looks its slot up by id, zeroes its quantity and clears the slot,
+    so the kernel walks over it without filling anything and no other order is shifted.
+    Cleared slots are skipped when orders are handed out and dropped when the live slice
+    is moved back to the front.
+
+    :ivar capacity: Number of slots allocated for the queue.
+    :type capacity: int
+    """
+    # Two queues are allocated per price level, so instances carry no __dict__
+    __slots__ = ("_qty", "_orders", "_head", "_tail", "_index", "_cancelled")
+
+    def __init__(self, capacity: int = 16):
+        self._qty = np.empty(capacity, dtype=np.int64)
+        self._orders = [None] * capacity
+        self._head = 0
+        self._tail = 0
+        # Slot of every order appended since the buffers were last compacted or emptied,
+        # entries of consumed orders are only dropped then so filling never touches it
+        self._index = {}
+        # Number of cancelled slots inside the live slice
+        self._cancelled = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._qty)
+
+    def __len__(self) -> int:
+        return self._tail - self._head - self._cancelled
+
+    def __iter__(self) -> Iterator[Order]:
+        live = self._orders[self._head:self._tail]
+        if self._cancelled:
+            live = [order for order in live if order is not None]
+        return iter(live)
+
+    def __getitem__(self, index: int) -> Order:
+        if not 0 <= index < len(self):
+            raise IndexError("OrderQueue index out of range")
+        if self._cancelled:
+            return list(self)[index]
+        return self._orders[self._head + index]
+
+    def __str__(self) -> str:
+        return f"OrderQueue({list(self)})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def append(self, order: Order) -> None:
+        """
+        Appends an order at the tail of the queue, making room first if the tail has
+        reached the end of the allocated arrays.
+
+        :param order: The order to append.
+        :type order: Order
+        :return: None
+        """
+        if self._tail == self.capacity:
+            self._make_room()
+        self._qty[self._tail] = order.quantity
+        self._orders[self._tail] = order
+        self._index[order.id] = self._tail
+        self._tail += 1
+
+    def take(self, requested_quantity: int, out_filled: List[Order]) -> Tuple[Optional[Order], int]:
+        """
+        Consumes orders from the head of the queue until the requested quantity is
+        satisfied or the queue is emptied.
+
+        The quantities are consumed by `_get_qty_kernel`, so the Python side only crosses
+        into the kernel once per call and then appends the filled orders to `out_filled`.
+
+        :param requested_quantity: The quantity to take from the queue.
+        :type requested_quantity: int
+        :param out_filled: List the completely filled orders are appended to.
+        :type out_filled: List[Order]
+        :return: A tuple containing an optional partially filled order and the quantity
+            that could not be filled.
+        :rtype: Tuple[Optional[Order], int]
+        """
+        head, tail = self._head, self._tail
+        if requested_quantity <= 0 or head == tail:
+            return None, requested_quantity
+
+        new_head, partial_qty, remaining_qty = _get_qty_kernel(self._qty, head, tail, requested_quantity)
+        new_head, partial_qty, remaining_qty = int(new_head), int(partial_qty), int(remaining_qty)
+
+        orders = self._orders
+        if self._cancelled:
+            filled = [order for order in orders[head:new_head] if order is not None]
+            self._cancelled -= new_head - head - len(filled)
+            out_filled.extend(filled)
+        else:
+            out_filled.extend(orders[head:new_head])
+        orders[head:new_head] = [None] * (new_head - head)
+        self._head = new_head
+        if self._cancelled:
+            self._skip_cancelled()
+
+        partial_order = None
+        if partial_qty:
+            current_order = orders[new_head]
+            partial_order = replace(current_order, quantity=partial_qty)
+            current_order.quantity -= partial_qty
+
+        if self._head == self._tail:
+            self._reset()
+
+        return partial_order, remaining_qty
+
+    def drain(self, out_filled: List[Order]) -> None:
+        """
+        Appends every queued order to `out_filled` and empties the queue, without walking
+        the quantities.
+
+        :param out_filled: List the drained orders are appended to.
+        :type out_filled: List[Order]
+        :return: None
+        """
+        head, tail = self._head, self._tail
+        if self._cancelled:
+            out_filled.extend(order for order in self._orders[head:tail] if order is not None)
+        else:
+            out_filled.extend(self._orders[head:tail])
+        self._orders[head:tail] = [None] * (tail - head)
+        self._reset()
+
+    def clear(self) -> None:
+        """
+        Drops every queued order, keeping the allocated buffers.
+
+        :return: None
+        """
+        head, tail = self._head, self._tail
+        self._orders[head:tail] = [None] * (tail - head)
+        self._reset()
+
+    def cancel(self, order_id: str) -> Optional[Order]:
+        """
+        Removes the order with the given id from the queue. The order's slot is cleared
+        and its quantity zeroed in place, so the remaining orders keep their slots.
+
+        :param order_id: The id of the order to cancel.
+        :type order_id: str
+        :return: The cancelled order, or None if no live order with that id is queued.
+        :rtype: Optional[Order]
+        """
+        slot = self._index.pop(order_id, None)
+        if slot is None or not self._head <= slot < self._tail:
+            return None
+        order = self._orders[slot]
+        if order is None or order.id != order_id:
+            return None
+
+        self._qty[slot] = 0
+        self._orders[slot] = None
+        self._cancelled += 1
+        self._skip_cancelled()
+        return order
+
+    def _skip_cancelled(self) -> None:
+        """
+        Moves the head and tail past cancelled slots at either end of the live slice, so
+        the head always holds a live order while the queue is not empty.
+
+        :return: None
+        """
+        orders, head, tail = self._orders, self._head, self._tail
+        while head < tail and orders[head] is None:
+            head += 1
+            self._cancelled -= 1
+        while head < tail and orders[tail - 1] is None:
+            tail -= 1
+            self._cancelled -= 1
+        if head == tail:
+            self._reset()
+        else:
+            self._head, self._tail = head, tail
+
+    def _reset(self) -> None:
+        """
+        Marks the emptied queue as starting again at the front of the buffers.
+
+        :return: None
+        """
+        self._head = self._tail = 0
+        self._index.clear()
+        self._cancelled = 0
+
+    def _make_room(self) -> None:
+        """
+        Moves the live slice back to the start of the buffers, dropping cancelled slots.
+        If the live orders fill more than half of the buffers, they are reallocated with
+        double capacity.
+
+        :return: None
+        """
+        head, tail = self._head, self._tail
+        live = self._orders[head:tail]
+        live_qty = self._qty[head:tail]
+        if self._cancelled:
+            keep = [index for index, order in enumerate(live) if order is not None]
+            live = [live[index] for index in keep]
+            live_qty = live_qty[keep]
+            self._cancelled = 0
+        size = len(live)
+        if size * 2 > self.capacity:
+            capacity = self.capacity * 2
+            qty = np.empty(capacity, dtype=np.int64)
+            qty[:size] = live_qty
+            self._qty = qty
+            self._orders = live + [None] * (capacity - size)
+        else:
+            self._qty[:size] = live_qty
+            self._orders[:size] = live
+            self._orders[size:tail] = [None] * (tail - size)
+        self._head, self._tail = 0, size
+        self._index = {order.id: slot for slot, order in enumerate(live)}
 
 
 class PriceLevel:
@@ -12,8 +245,8 @@ class PriceLevel:
         self.short_total = 0
         self.price = price
         # Separate queues for LONG and SHORT positions
-        self.long_orders = deque() # FIFO queue
-        self.short_orders = deque() # FIFO queue
+        self.long_orders = OrderQueue() # FIFO queue
+        self.short_orders = OrderQueue() # FIFO queue
 
     def __str__(self) -> str:
         str_out = (f"price={self.price}, "
@@ -42,19 +275,60 @@ class PriceLevel:
             and updates the respective total quantity.
         :rtype: None
         """
-        if order.position == Position.LONG:
+        if order.position is LONG:
             self.long_orders.append(order)
             self.long_total += order.quantity
         else:
             self.short_orders.append(order)
             self.short_total += order.quantity
 
+    def reset(self) -> None:
+        """
+        Empties both queues and zeroes the totals so the level can be reused at another
+        price. The queues keep their buffers, which is what makes reusing a level cheaper
+        than building a new one.
+
+        :return: None
+        """
+        self.long_orders.clear()
+        self.short_orders.clear()
+        self.long_total = 0
+        self.short_total = 0
+
+    def is_empty(self) -> bool:
+        """
+        Checks whether the price level has no resting orders left in either queue.
+
+        :return: True if both the long and short queues are empty, False otherwise.
+        :rtype: bool
+        """
+        return not self.long_orders and not self.short_orders
+
+    def cancel(self, order_id: str) -> Optional[Order]:
+        """
+        Cancels the resting order with the given id from whichever queue holds it and
+        deducts its remaining quantity from that queue's total.
+
+        :param order_id: The id of the order to cancel.
+        :type order_id: str
+        :return: The cancelled order, or None if no order with that id rests at this level.
+        :rtype: Optional[Order]
+        """
+        order = self.long_orders.cancel(order_id)
+        if order is not None:
+            self.long_total -= order.quantity
+            return order
+        order = self.short_orders.cancel(order_id)
+        if order is not None:
+            self.short_total -= order.quantity
+        return order
+
     def can_match(self, order: Order) -> bool:
         """
-        Determines if the given order can be matched based on its position and side by
-        validating it against predefined valid match combinations. This method uses the
-        order's side and position to lookup potential matching orders in the respective
-        queue and checks their validity.
+        Determines if the given order can be matched based on its position and side. A valid
+        counterpart always has both the opposite side and the opposite position of the order,
+        so this method looks at the head of the queue holding the opposite position and checks
+        that it sits on the opposite side.
 
         :param order: The order to evaluate for potential matching.
         :type order: Order
@@ -62,57 +336,49 @@ class PriceLevel:
         :return: True if a matching order exists in the respective queue, False otherwise.
         :rtype: bool
         """
-        # Valid matching combinations
-        valid_matches = {
-            (OrderSide.BUY, Position.LONG): (OrderSide.SELL, Position.SHORT),
-            (OrderSide.SELL, Position.LONG): (OrderSide.BUY, Position.SHORT),
-            (OrderSide.BUY, Position.SHORT): (OrderSide.SELL, Position.LONG),
-            (OrderSide.SELL, Position.SHORT): (OrderSide.BUY, Position.LONG)
-        }
+        queue = self.short_orders if order.position is LONG else self.long_orders
 
-        target = valid_matches.get((order.side, order.position))
-        queue = self.long_orders if target[1] == Position.LONG else self.short_orders
+        return len(queue) > 0 and queue[0].side is not order.side
 
-        return len(queue) > 0 and next(iter(queue)).side == target[0]
-
-    def get_qty(self, requested_quantity: int, position: Position) -> Tuple[List[Order], Optional[Order], int]:
+    def get_qty(self, requested_quantity: int, position: Position, out_filled: List[Order]) -> \
+            Tuple[Optional[Order], int]:
         """
-        Retrieves filled orders, a partially filled order if applicable, and the remaining quantity
-        from the queue based on the requested quantity and the specified position. The function
-        processes orders in a queue until the requested quantity is satisfied or the queue is emptied.
-        The provided position determines whether to operate on the long or short order queue.
+        Fills orders from the queue based on the requested quantity and the specified position,
+        appending the completely filled orders to `out_filled` and returning a partially filled
+        order if applicable together with the remaining quantity. The function consumes orders
+        from the head of the queue until the requested quantity is satisfied or the queue is
+        emptied. The provided position determines whether to operate on the long or short order
+        queue. The quantity resting in each queue is kept as a running total, so a request
+        covering the whole queue drains it in one step, and otherwise the walk is known to stop
+        inside the queue, so nothing is left to compute once it returns.
 
         :param requested_quantity: The quantity to fulfill orders from the order queue.
         :type requested_quantity: int
         :param position: The position type (LONG or SHORT) indicating the order queue to process.
         :type position: Position
-        :return: A tuple containing a list of completely filled orders, an optional partially filled
-                 order, and the remaining quantity after processing.
-        :rtype: Tuple[List[Order], Optional[Order], int]
+        :param out_filled: List the completely filled orders are appended to, so callers matching
+            across several levels can accumulate all fills into a single list.
+        :type out_filled: List[Order]
+        :return: A tuple containing an optional partially filled order and the remaining quantity
+                 after processing.
+        :rtype: Tuple[Optional[Order], int]
         """
-        queue = self.long_orders if position == Position.LONG else self.short_orders
-        filled_orders = []
-        remaining_qty = requested_quantity
-        partial_order = None
-        total = self.long_total if position == Position.LONG else self.short_total
-
-        while remaining_qty > 0 and queue:
-            current_order = queue[0]
-
-            if current_order.quantity <= remaining_qty:
-                filled_orders.append(queue.popleft())
-                remaining_qty -= current_order.quantity
-                total -= current_order.quantity
-            else:
-                partial_order = deepcopy(current_order)
-                partial_order.quantity = remaining_qty
-                queue[0].quantity -= remaining_qty
-                total -= remaining_qty
-                remaining_qty = 0
-
-        if position == Position.LONG:
+        if position is LONG:
+            queue, total = self.long_orders, self.long_total
+        else:
+            queue, total = self.short_orders, self.short_total
+
+        if requested_quantity >= total:
+            # Sweeping the whole queue, no need to walk the quantities
+            queue.drain(out_filled)
+            partial_order, remaining_qty, total = None, requested_quantity - total, 0
+        else:
+            # The running total covers the request, so the walk always fills it
+            partial_order, _ = queue.take(requested_quantity, out_filled)
+            remaining_qty, total = 0, total - requested_quantity
+
+        if position is LONG:
             self.long_total = total
         else:
             self.short_total = total
-
-        return filled_orders, partial_order, remaining_qty
\ No newline at end of file
+        return partial_order, remaining_qty
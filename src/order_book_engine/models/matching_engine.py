@@ -1,34 +1,56 @@
-from abc import ABC, abstractmethod
-from typing import List, Tuple, Optional, OrderedDict
+import math
+from decimal import Decimal
+from functools import partial
+from typing import List, Tuple, Optional, Iterator
 
 from .level import PriceLevel
-from .order import Order, OrderSide, Position
+from .order import Order, OrderSide, Position, BUY, SELL, LONG, SHORT
 
 
-class MatchingEngine(ABC):
+class MatchingEngine:
     """
-    Abstract base class for implementing a matching engine in a trading system.
+    Base class for implementing a matching engine in a trading system.
 
     A Matching Engine is responsible for matching buy and sell orders based on their
     prices and other attributes, such as position and side. Concrete implementations
-    must provide methods for fetching the best ask and bid prices, as well as the logic
-    for fulfilling market and limit orders. The class includes abstract methods that
-    must be implemented by subclasses and helper methods for handling various order types.
+    must provide methods for fetching the best ask and bid prices and for walking the
+    price levels in priority order, as well as the logic for fulfilling market and limit
+    orders. The class declares the methods that must be overridden by subclasses, which
+    raise NotImplementedError otherwise, and helper methods for handling various order
+    types. It is a plain class rather than an ABC so that method lookups on the matching
+    path do not go through the abstract-method machinery.
 
     :ivar symbol: The trading symbol (e.g., "AAPL", "BTCUSD") the matching
         engine is managing orders for.
     :type symbol: str
+    :ivar tick_size: The minimum price increment of the traded symbol. Limit prices are
+        compared with the price levels in ticks of this size.
+    :type tick_size: float
     """
 
-    def __init__(self, symbol: str):
+    def __init__(self, symbol: str, tick_size: float = 0.01):
         self.symbol = symbol
+        self.tick_size = tick_size
+        # Market order handlers keyed by the (side, position) of the incoming order
+        self._market_handlers = {
+            (BUY, LONG): self._handle_buy_order,
+            (BUY, SHORT): self._handle_buy_order,
+            (SELL, LONG): self._handle_sell_order,
+            (SELL, SHORT): self._handle_sell_order,
+        }
+        # Limit order matchers keyed the same way, bound to the position they consume
+        self._limit_handlers = {
+            (BUY, LONG): partial(self._match_limit_buy, SHORT),
+            (BUY, SHORT): partial(self._match_limit_buy, LONG),
+            (SELL, LONG): partial(self._match_limit_sell, SHORT),
+            (SELL, SHORT): partial(self._match_limit_sell, LONG),
+        }
 
-    @abstractmethod
     def match(self, order: Order) -> List[Tuple[Order, Order]]:
         """
         Matches new orders with existing ones based on predefined rules.
 
-        This abstract method is responsible for defining the logic to match
+        This method is responsible for defining the logic to match
         incoming orders with orders already present in a system. The matching
         process ensures that the pairing of orders adheres to the system's
         rules to fulfill the requirements of a transactional exchange.
@@ -39,15 +61,58 @@ class MatchingEngine(ABC):
             orders.
         :rtype: List[Tuple[Order, Order]]
         """
-        pass
+        raise NotImplementedError
+
+    def price_to_ticks(self, price: float) -> int:
+        """
+        Converts a price into an integer number of ticks of this engine's tick size.
+
+        :param price: The price to convert.
+        :type price: float
+        :return: The price expressed in ticks, rounded to the nearest tick.
+        :rtype: int
+        """
+        return int(round(price / self.tick_size))
+
+    def limit_to_ticks(self, price: float, side: OrderSide) -> int:
+        """
+        Converts a limit price into ticks of this engine's tick size. A price off the tick grid
+        is rounded to the tick on the trader's side of it, down for buy orders and up for sell
+        orders, so an order never trades or rests beyond its limit. Prices within float noise
+        of a tick are taken as that tick.
+
+        :param price: The limit price to convert.
+        :type price: float
+        :param side: The side of the order the limit belongs to.
+        :type side: OrderSide
+        :return: The limit price expressed in ticks.
+        :rtype: int
+        """
+        exact = price / self.tick_size
+        ticks = round(exact)
+        if abs(exact - ticks) <= 1e-9 * max(1.0, abs(exact)):
+            return int(ticks)
+        return math.floor(exact) if side is BUY else math.ceil(exact)
+
+    def ticks_to_price(self, ticks: int) -> float:
+        """
+        Converts a number of ticks back into a price, rounded to the decimals of the tick
+        size so that e.g. 9999 ticks of 0.01 give 99.99 rather than 99.99000000000001.
+
+        :param ticks: The price expressed in ticks.
+        :type ticks: int
+        :return: The price of the tick.
+        :rtype: float
+        """
+        decimals = max(0, -Decimal(repr(self.tick_size)).normalize().as_tuple().exponent)
+        return round(ticks * self.tick_size, decimals)
 
-    @abstractmethod
     def get_best_ask(self) -> Optional[Tuple[float, PriceLevel]]:
         """
         Retrieve the best ask (lowest price) and its associated price level from the market
         data.
 
-        This method is abstract and must be implemented in a subclass. It is used to fetch
+        This method must be implemented in a subclass. It is used to fetch
         the best available ask price, which helps in analyzing and determining market trends
         or executing trading strategies.
 
@@ -56,12 +121,11 @@ class MatchingEngine(ABC):
             If no ask price is available, returns None.
         :rtype: Optional[Tuple[float, PriceLevel]]
         """
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def get_best_bid(self) -> Optional[Tuple[float, PriceLevel]]:
         """
-        Provides an abstract method to retrieve the best bid including its associated price
+        Provides a method to retrieve the best bid including its associated price
         level from a given data structure or source. This method is intended to be implemented
         by subclasses, ensuring that they define the specific behavior for extracting the best
         bid details.
@@ -70,16 +134,65 @@ class MatchingEngine(ABC):
             PriceLevel object, or None if no valid bid is available.
         :rtype: Optional[Tuple[float, PriceLevel]]
         """
-        pass
+        raise NotImplementedError
+
+    def _iter_asks(self) -> Iterator[Tuple[int, PriceLevel]]:
+        """
+        Yields the ask price levels with their prices in ticks from the lowest price upwards.
+        The matching logic walks the asks with it and only removes levels once the walk is
+        over, so implementations may assume the book does not change while it is in progress.
+
+        :return: An iterator over (ticks, PriceLevel) tuples in priority order.
+        :rtype: Iterator[Tuple[int, PriceLevel]]
+        """
+        raise NotImplementedError
+
+    def _iter_bids(self) -> Iterator[Tuple[int, PriceLevel]]:
+        """
+        Yields the bid price levels with their prices in ticks from the highest price
+        downwards, with the same guarantee as `_iter_asks`.
+
+        :return: An iterator over (ticks, PriceLevel) tuples in priority order.
+        :rtype: Iterator[Tuple[int, PriceLevel]]
+        """
+        raise NotImplementedError
+
+    def _remove_ask(self, ticks: int) -> None:
+        """
+        Removes the ask price level at the given price in ticks. Called by the matching logic for
+        every level of the walk over `_iter_asks` that was left without resting orders.
+
+        :param ticks: The price of the ask level to remove, in ticks.
+        :type ticks: int
+        :return: None
+        """
+        raise NotImplementedError
+
+    def _remove_bid(self, ticks: int) -> None:
+        """
+        Removes the bid price level at the given price in ticks. Called by the matching logic for
+        every level of the walk over `_iter_bids` that was left without resting orders.
+
+        :param ticks: The price of the bid level to remove, in ticks.
+        :type ticks: int
+        :return: None
+        """
+        raise NotImplementedError
 
     def _match_market_order(self, order: Order) -> Tuple[List[Order], List[Order]]:
         """
-        Matches a given market order with existing orders in the order book. Depending on
-        the type of the input order, delegates handling and processing to the respective
-        handler responsible for either buy or sell orders. The function determines whether
-        the order is to open or close long/short positions and processes accordingly.
+        Matches a given market order with existing orders in the order book. The handler for
+        the order's side and position is looked up in a table built once per engine, so buy
+        orders are delegated to `_handle_buy_order` and sell orders to `_handle_sell_order`
+        without evaluating any branch per order.
 
-        :param order: The market order to be matched against the order book.
+        An order only consumes the queue holding the opposite position, so a level can keep
+        resting orders without having anything for it. The handlers therefore walk past such
+        levels instead of stopping at them, and remove the levels they emptied once the walk
+        is over.
+
+        :param order: The market order to be matched against the order book. Its `quantity`
+            attribute is updated with the quantity left after matching.
         :type order: Order
 
         :return: A tuple containing two lists:
@@ -87,35 +200,19 @@ class MatchingEngine(ABC):
             - The second list consists of partially filled orders.
         :rtype: Tuple[List[Order], List[Order]]
         """
-        filled_orders = []
-        partially_filled_orders = []
-
-        # Check the order type and delegate to the respective handler
-        is_buy_long = order.side == OrderSide.BUY and order.position == Position.LONG
-        is_buy_short = order.side == OrderSide.BUY and order.position == Position.SHORT
-        is_sell_short = order.side == OrderSide.SELL and order.position == Position.SHORT
-        is_sell_long = order.side == OrderSide.SELL and order.position == Position.LONG
-
-        if is_buy_long or is_buy_short:
-            filled_orders, partially_filled_orders = self._handle_buy_order(filled_orders, partially_filled_orders,
-                                                                            order)
-        elif is_sell_short or is_sell_long:
-            filled_orders, partially_filled_orders = self._handle_sell_order(filled_orders, partially_filled_orders,
-                                                                             order)
-
-        return filled_orders, partially_filled_orders
+        handler = self._market_handlers[(order.side, order.position)]
+        return handler([], [], order)
 
     def _handle_buy_order(self, filled_orders: List[Order], partially_filled_orders: List[Order], order: Order) -> \
             Tuple[
                 List[Order], List[Order]]:
         """
-        Handles a buy order by attempting to match it with the best available ask in the market.
+        Handles a buy order by matching it against the best available asks in the market.
 
-        This function processes a buy order by first checking the best ask price from the order book.
-        If a potential match exists, it attempts to fill the order. Any fully filled orders,
-        partially filled orders, or remaining quantities are updated accordingly. If there's
-        unfulfilled quantity left in the buy order after matching with the best ask, subsequent
-        matching with the market is attempted.
+        This function walks the ask side from the best price level in a single loop, filling the
+        SHORT queue of each level. Any fully filled orders and partially filled orders are collected,
+        and every level that is left without resting orders is removed from the book. Matching stops
+        when the buy order is completely filled or the book runs out of asks.
 
         Parameters:
         :param filled_orders: List of orders that have been completely filled during the processing
@@ -129,26 +226,29 @@ class MatchingEngine(ABC):
         :return: A tuple containing updated lists of filled orders and partially filled orders,
                  respectively.
         """
-        best_ask = self.get_best_ask()
-        if best_ask:
-            filled, partially_filled, remaining_qty = best_ask[1].get_qty(order.quantity, Position.SHORT)
-            filled_orders.extend(filled)
+        remaining_qty = order.quantity
+        emptied = []
+        for ticks, level in self._iter_asks():
+            partially_filled, remaining_qty = level.get_qty(remaining_qty, SHORT, filled_orders)
             if partially_filled:
                 partially_filled_orders.append(partially_filled)
-            if remaining_qty > 0:
-                order.quantity = remaining_qty
-                more_filled, more_partial = self._match_market_order(order)
-                filled_orders.extend(more_filled)
-                partially_filled_orders.extend(more_partial)
+            if level.is_empty():
+                emptied.append(ticks)
+            if remaining_qty == 0:
+                break
+        for ticks in emptied:
+            self._remove_ask(ticks)
+        order.quantity = remaining_qty
         return filled_orders, partially_filled_orders
 
     def _handle_sell_order(self, filled_orders: List[Order], partially_filled_orders: List[Order], order: Order) -> \
             Tuple[
                 List[Order], List[Order]]:
         """
-        Handles a sell order by matching it with the best bid available in the market. It processes filled,
-        partially filled, and remaining quantities of the order and updates the provided lists of filled
-        and partially filled orders accordingly.
+        Handles a sell order by matching it against the best bids available in the market. It walks
+        the bid side from the best price level in a single loop, filling the LONG queue of each level
+        and updating the provided lists of filled and partially filled orders accordingly. Bid levels
+        left without resting orders are removed from the book.
 
         :param filled_orders:
             A list of orders that have been completely filled. This list will be updated with orders
@@ -157,8 +257,8 @@ class MatchingEngine(ABC):
             A list of orders that have been partially filled. This list will be updated with orders that
             are partially filled during the execution of this function.
         :param order:
-            The sell order to be matched with the best bid. Its `quantity` attribute may be updated if
-            there is remaining quantity after matching with bids.
+            The sell order to be matched with the best bids. Its `quantity` attribute is updated with
+            the quantity left after matching with bids.
         :return:
             A tuple containing two lists:
             - The first list contains all the completely filled orders, including the ones updated during
@@ -166,51 +266,102 @@ class MatchingEngine(ABC):
             - The second list contains all partially filled orders, including the ones updated during this
               function call.
         """
-        best_bid = self.get_best_bid()
-        if best_bid:
-            filled, partially_filled, remaining_qty = best_bid[1].get_qty(order.quantity, Position.LONG)
-            filled_orders.extend(filled)
+        remaining_qty = order.quantity
+        emptied = []
+        for ticks, level in self._iter_bids():
+            partially_filled, remaining_qty = level.get_qty(remaining_qty, LONG, filled_orders)
             if partially_filled:
                 partially_filled_orders.append(partially_filled)
-            if remaining_qty > 0:
-                order.quantity = remaining_qty
-                more_filled, more_partial = self._match_market_order(order)
-                filled_orders.extend(more_filled)
-                partially_filled_orders.extend(more_partial)
+            if level.is_empty():
+                emptied.append(ticks)
+            if remaining_qty == 0:
+                break
+        for ticks in emptied:
+            self._remove_bid(ticks)
+        order.quantity = remaining_qty
         return filled_orders, partially_filled_orders
 
-    def _match_limit_order(self, order: Order, asks: OrderedDict, bids: OrderedDict) -> Tuple[Order, List[Order], int]:
+    def _match_limit_order(self, order: Order) -> Tuple[Order, List[Order], int]:
+        """
+        Matches a limit order against the opposite side of the book for as long as the best price
+        level is within the order's limit price, comparing both in ticks. Buy orders walk the asks
+        up to their price and sell orders walk the bids down to their price, consuming the queue
+        holding the opposite position.
+        Every level that is left without resting orders is removed from the book once the walk is
+        over, and levels that only hold orders of the position the order cannot consume are walked
+        past, as for market orders. The matcher for the order's side and position is looked up in
+        a table built once per engine, with the opposite position already bound.
+
+        :param order: The limit order to be matched. Its `quantity` attribute is updated with the
+            quantity left after matching.
+        :type order: Order
+        :return: A tuple containing the order, the list of matched (fully or partially filled)
+            orders, and the quantity of the order that is still unfilled.
+        :rtype: Tuple[Order, List[Order], int]
+        """
+        matcher = self._limit_handlers[(order.side, order.position)]
+        return matcher(order)
+
+    def _match_limit_buy(self, position: Position, order: Order) -> Tuple[Order, List[Order], int]:
+        """
+        Walks the asks from the best price up to the buy order's limit price, consuming the queue
+        of the given position at each level.
+
+        :param position: The position of the resting orders the buy order is matched against.
+        :type position: Position
+        :param order: The buy limit order to be matched.
+        :type order: Order
+        :return: A tuple containing the order, the list of matched orders, and the quantity of the
+            order that is still unfilled.
+        :rtype: Tuple[Order, List[Order], int]
+        """
         matched_orders = []
+        limit_ticks = self.limit_to_ticks(order.price, BUY)
+        remain = order.quantity
+        emptied = []
+        for ticks, level in self._iter_asks():
+            if ticks > limit_ticks:
+                break
+            partially_filled, remain = level.get_qty(remain, position, matched_orders)
+            if partially_filled:
+                matched_orders.append(partially_filled)
+            if level.is_empty():
+                emptied.append(ticks)
+            if remain == 0:
+                break
+        for ticks in emptied:
+            self._remove_ask(ticks)
+        order.quantity = remain
+        return order, matched_orders, remain
 
-        if order.side == OrderSide.BUY:
-            while asks and min(asks.keys()) <= order.price:
-                best_ask = self.get_best_ask()
-                if not best_ask:  # Check if the best ask exists
-                    break
-                filled, partial, remain = best_ask[1].get_qty(
-                    order.quantity,
-                    Position.SHORT if order.position == Position.LONG else Position.LONG
-                )
-                matched_orders.extend(filled)
-                if partial:
-                    matched_orders.append(partial)
-                if remain == 0:
-                    break
-                order.quantity = remain
-        else:  # SELL
-            while bids and max(bids.keys()) >= order.price:
-                best_bid = self.get_best_bid()
-                if not best_bid:  # Check if the best bid exists
-                    break
-                filled, partial, remain = best_bid[1].get_qty(
-                    order.quantity,
-                    Position.LONG if order.position == Position.SHORT else Position.SHORT
-                )
-                matched_orders.extend(filled)
-                if partial:
-                    matched_orders.append(partial)
-                if remain == 0:
-                    break
-                order.quantity = remain
-
-        return order, matched_orders, order.quantity
+    def _match_limit_sell(self, position: Position, order: Order) -> Tuple[Order, List[Order], int]:
+        """
+        Walks the bids from the best price down to the sell order's limit price, consuming the
+        queue of the given position at each level.
+
+        :param position: The position of the resting orders the sell order is matched against.
+        :type position: Position
+        :param order: The sell limit order to be matched.
+        :type order: Order
+        :return: A tuple containing the order, the list of matched orders, and the quantity of the
+            order that is still unfilled.
+        :rtype: Tuple[Order, List[Order], int]
+        """
+        matched_orders = []
+        limit_ticks = self.limit_to_ticks(order.price, SELL)
+        remain = order.quantity
+        emptied = []
+        for ticks, level in self._iter_bids():
+            if ticks < limit_ticks:
+                break
+            partially_filled, remain = level.get_qty(remain, position, matched_orders)
+            if partially_filled:
+                matched_orders.append(partially_filled)
+            if level.is_empty():
+                emptied.append(ticks)
+            if remain == 0:
+                break
+        for ticks in emptied:
+            self._remove_bid(ticks)
+        order.quantity = remain
+        return order, matched_orders, remain
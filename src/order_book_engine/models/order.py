@@ -1,10 +1,13 @@
-from enum import Enum
+import time
+from enum import IntEnum
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 
+import numpy as np
 
-class OrderType(Enum):
+
+class OrderType(IntEnum):
     """
     Represents different types of order classifications used in trading or financial
     platforms. These types define how the order is handled when submitted to the
@@ -12,44 +15,86 @@ class OrderType(Enum):
 
     This class is an enumeration that can be used to specify whether an order is
     processed as a 'LIMIT' order or a 'MARKET' order, defining its execution
-    criteria.
+    criteria. Members are backed by small integers so comparisons are plain
+    integer operations.
 
     :ivar LIMIT: Indicates that the order should be executed at a specific
         price or better.
-    :type LIMIT: str
+    :type LIMIT: int
     :ivar MARKET: Indicates that the order should be executed immediately at
         the current market price.
-    :type MARKET: str
+    :type MARKET: int
     """
-    LIMIT = "LIMIT"
-    MARKET = "MARKET"
+    LIMIT = 0
+    MARKET = 1
 
 
-class OrderSide(Enum):
+class OrderSide(IntEnum):
     """
     Represents the sides of an order in trading.
 
     This enumeration contains the possible sides of an order, which are typically used
     in trading systems to specify whether an order is for buying or selling an asset.
+    Members are backed by the integers 0 and 1.
     """
-    BUY = "BUY"
-    SELL = "SELL"
+    BUY = 0
+    SELL = 1
 
 
-class Position(Enum):
+class Position(IntEnum):
     """
     Defines an enumeration for Position with specified constants.
 
     The `Position` enumeration is used to represent specific states or modes
     for a given context. It contains two constants: `LONG` and `SHORT`, which
     can be utilized in various applications where such classification is
-    required.
+    required. Members are backed by the integers 0 and 1.
+    """
+    LONG = 0
+    SHORT = 1
+
+
+# Module-level aliases of the enum members. Enum members are singletons, so hot paths
+# compare against these with ``is``, which skips both the attribute lookup and ``__eq__``.
+LIMIT, MARKET = OrderType.LIMIT, OrderType.MARKET
+BUY, SELL = OrderSide.BUY, OrderSide.SELL
+LONG, SHORT = Position.LONG, Position.SHORT
+
+# Enum members indexed by their 0/1 value, to decode integer order fields without calling the enum
+ORDER_TYPES = (LIMIT, MARKET)
+ORDER_SIDES = (BUY, SELL)
+POSITIONS = (LONG, SHORT)
+
+# Flat record layout of an order, used for batches of incoming orders (see
+# ``OrderBook.match_batch``) and convertible with ``Order.from_record``. The 8-byte fields
+# come first and the enum values are packed after them, so with alignment every record is
+# 40 bytes and no field straddles its natural boundary. ``ts`` is in nanoseconds.
+ORDER_DT = np.dtype([
+    ("id", "i8"),
+    ("price", "f8"),
+    ("qty", "i8"),
+    ("ts", "i8"),
+    ("side", "u1"),
+    ("pos", "u1"),
+    ("type", "u1"),
+], align=True)
+
+
+def datetime_to_ns(dt: datetime) -> int:
     """
-    LONG = "LONG"
-    SHORT = "SHORT"
+    Converts a datetime into integer nanoseconds since the Unix epoch, the representation
+    used for order timestamps. Naive datetimes are interpreted as local time, as in
+    ``datetime.timestamp``.
+
+    :param dt: The datetime to convert.
+    :type dt: datetime
+    :return: Nanoseconds since the epoch, with the datetime's microsecond precision.
+    :rtype: int
+    """
+    return round(dt.timestamp() * 1_000_000) * 1_000
 
 
-@dataclass
+@dataclass(slots=True, init=False, repr=False)
 class Order:
     """
     Represents an order in a financial trading system.
@@ -59,6 +104,11 @@ class Order:
     This class supports limit orders by requiring a price for such orders
     upon initialization.
 
+    Fields are declared with the ones read while matching (quantity, side,
+    position, price and type) first, so they sit next to each other at the
+    start of the slotted instance. The constructor, ``__match_args__`` and
+    ``repr`` keep the original argument order.
+
     :ivar id: Unique identifier for the order.
     :type id: str
     :ivar type: Type of the order (e.g., LIMIT, MARKET).
@@ -69,24 +119,61 @@ class Order:
     :type position: Position
     :ivar quantity: Quantity of the order.
     :type quantity: int
-    :ivar timestamp: Timestamp indicating when the order was created.
-    :type timestamp: datetime
+    :ivar timestamp: Time the order was created, in nanoseconds since the epoch. A
+        datetime passed to the constructor is converted with `datetime_to_ns`, so time
+        priority is compared on plain integers. When omitted, the current time is read
+        with ``time.time_ns``, which builds no datetime object.
+    :type timestamp: int
     :ivar price: Price for the order if it is a limit order. This is optional
         and only required for limit orders.
     :type price: Optional[float]
     """
-    id: str
-    symbol: str
-    type: OrderType
+    quantity: int
     side: OrderSide
     position: Position
-    quantity: int
-    timestamp: datetime
-
-    price: Optional[float] = None
+    price: Optional[float]
+    type: OrderType
+    id: str
+    symbol: str
+    timestamp: int
 
+    # Positional patterns bind the fields in constructor order, not declaration order
+    __match_args__ = ("id", "symbol", "type", "side", "position", "quantity", "timestamp", "price")
 
-    def __post_init__(self):
-        if self.type == OrderType.LIMIT and self.price is None:
+    def __init__(self, id: str, symbol: str, type: OrderType, side: OrderSide, position: Position,
+                 quantity: int, timestamp: Union[int, datetime, None] = None, price: Optional[float] = None):
+        if type is LIMIT and price is None:
             raise ValueError("Limit orders must have a price")
-
+        self.quantity = quantity
+        self.side = side
+        self.position = position
+        self.price = price
+        self.type = type
+        self.id = id
+        self.symbol = symbol
+        if timestamp is None:
+            timestamp = time.time_ns()
+        elif isinstance(timestamp, datetime):
+            timestamp = datetime_to_ns(timestamp)
+        self.timestamp = timestamp
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__match_args__)
+        return f"{type(self).__name__}({fields})"
+
+    @classmethod
+    def from_record(cls, record: np.void, symbol: str) -> "Order":
+        """
+        Builds an order from one ``ORDER_DT`` record, for handing orders kept in flat
+        arrays to code that works with ``Order`` objects.
+
+        :param record: The record to convert, e.g. ``orders[i]`` of an ``ORDER_DT`` array.
+        :type record: np.void
+        :param symbol: The trading symbol of the order, which records do not carry.
+        :type symbol: str
+        :return: The order described by the record. Market records get no price.
+        :rtype: Order
+        """
+        order_type = ORDER_TYPES[record["type"]]
+        return cls(str(record["id"]), symbol, order_type, ORDER_SIDES[record["side"]], POSITIONS[record["pos"]],
+                   int(record["qty"]), int(record["ts"]), float(record["price"]) if order_type is LIMIT else None)
@@ -1,13 +1,49 @@
-from abc import ABC
-from collections import OrderedDict
-from typing import Tuple, Optional, List
+import heapq
+from typing import Tuple, Optional, List, Iterator, Dict
+
+import numpy as np
 
 from .level import PriceLevel
 from .matching_engine import MatchingEngine
-from .order import Order, OrderType, OrderSide
+from .order import Order, MARKET, BUY, SELL, LIMIT, ORDER_DT, ORDER_TYPES, ORDER_SIDES, POSITIONS
+from ..utils.ring import SPSCRing
+
+# Most removed price levels a book keeps for reuse, levels released beyond it are dropped
+_LEVEL_POOL_SIZE = 64
+
+
+def _walk_heap(heap: List[int], levels: Dict[int, PriceLevel], sign: int) -> Iterator[Tuple[int, PriceLevel]]:
+    """
+    Yields the live price levels of a top-of-book heap in heap order without popping it.
+    A second heap holds the frontier of heap slots still to visit, so reaching the k-th
+    level costs O(k log k) regardless of the size of the book. Tombstoned entries have no
+    level and are skipped.
+
+    :param heap: The heap of ticks to walk, with every entry multiplied by `sign`.
+    :type heap: List[int]
+    :param levels: The price levels of the heap's side, keyed by ticks.
+    :type levels: Dict[int, PriceLevel]
+    :param sign: -1 for the negated bid heap, 1 for the ask heap.
+    :type sign: int
+    :return: An iterator over (ticks, PriceLevel) tuples from the best price outwards.
+    :rtype: Iterator[Tuple[int, PriceLevel]]
+    """
+    size = len(heap)
+    frontier = [(heap[0], 0)] if size else []
+    while frontier:
+        key, slot = heapq.heappop(frontier)
+        ticks = key * sign
+        level = levels.get(ticks)
+        if level is not None:
+            yield ticks, level
+        child = 2 * slot + 1
+        if child < size:
+            heapq.heappush(frontier, (heap[child], child))
+            if child + 1 < size:
+                heapq.heappush(frontier, (heap[child + 1], child + 1))
 
 
-class OrderBook(MatchingEngine, ABC):
+class OrderBook(MatchingEngine):
     """
     Handles an Order Book for a specific traded symbol, maintaining
     and updating the state of buy and sell orders.
@@ -16,26 +52,56 @@ class OrderBook(MatchingEngine, ABC):
     the best bid and ask prices, and calculating the bid-ask spread. It supports both
     market and limit orders, updating the order book as orders are matched or added.
 
-    :ivar bids: A dictionary of current bid price levels keyed by price.
-    :type bids: OrderedDict
-    :ivar asks: A dictionary of current ask price levels keyed by price.
-    :type asks: OrderedDict
+    Prices are normalized to integer ticks of ``tick_size`` when orders enter the book,
+    with off-grid limits rounded towards the trader by `limit_to_ticks`, and price levels
+    are keyed by those ticks, so hashing and comparing prices are exact integer
+    operations. The best prices are tracked with a max-heap of bid ticks and a
+    min-heap of ask ticks next to the price level dictionaries. Removed levels are only
+    marked as tombstones and dropped from a heap once they reach its top, and a heap is
+    rebuilt from the live levels whenever its tombstones outnumber them.
+
+    Removed price levels are reset and pooled up to a small fixed number, and the next new
+    price reuses one of them together with its queue buffers, so a level obtained from
+    `get_best_bid` or `get_best_ask` must not be kept after it has been removed from the book.
+
+    :ivar bids: A dictionary of current bid price levels keyed by price in ticks.
+    :type bids: dict
+    :ivar asks: A dictionary of current ask price levels keyed by price in ticks.
+    :type asks: dict
     :ivar symbol: The trading symbol this order book is associated with.
     :type symbol: str
+    :ivar tick_size: The minimum price increment of the traded symbol.
+    :type tick_size: float
     """
-    def __init__(self, symbol: str):
-        super().__init__(symbol)
-        self.bids = OrderedDict()
-        self.asks = OrderedDict()
+    def __init__(self, symbol: str, tick_size: float = 0.01):
+        super().__init__(symbol, tick_size)
+        self.bids = {}
+        self.asks = {}
+        # Bid ticks are negated so that heapq's min-heap yields the highest bid first
+        self._bid_heap = []
+        self._ask_heap = []
+        # Ticks of removed levels that are still waiting in their heap
+        self._bid_tombstones = set()
+        self._ask_tombstones = set()
+        # Best ticks are cached and only refreshed when a price level is created or removed
+        self._best_bid_ticks = None
+        self._best_ask_ticks = None
+        # (price, PriceLevel) tuples handed out by get_best_bid/get_best_ask
+        self._best_bid = None
+        self._best_ask = None
+        # Removed price levels, reset and waiting to be reused for the next new price
+        self._level_pool = []
+        # Resting orders by id, so a cancel finds its level without searching the book
+        self._by_id = {}
 
     def __str__(self) -> str:
         str_out = (f"symbol={self.symbol}, \n")
 
-        for price, level in self.bids.items():
-            str_out += f"\t{level}, \n"
+        for ticks in sorted(self.bids):
+            str_out += f"\t{self.bids[ticks]}, \n"
 
-        for price, level in self.asks.items():
-            str_out += f"\t{level}, \n"
+        for ticks in sorted(self.asks):
+            str_out += f"\t{self.asks[ticks]}, \n"
 
         return str_out
 
@@ -48,31 +114,181 @@ class OrderBook(MatchingEngine, ABC):
 
         If the order type is MARKET, it attempts to match the order with existing limit orders
         and returns the matching results. If no orders are matched, an exception is raised. For
-        LIMIT orders, it matches the order with available orders, processes the remaining
-        quantity, and updates the order book accordingly.
+        LIMIT orders, it matches the order with available orders, and any remaining quantity
+        is added to the order book as a resting order. A LIMIT order whose id already belongs
+        to a resting order is rejected before matching, since cancels look orders up by id.
 
         :param order: The order to be matched.
         :type order: Order
         :return: A tuple containing the matched order and a list of matched or partially filled
             orders.
         :rtype: Tuple[Order, List[Order]]
-        :raises ValueError: If no orders are matched for a MARKET order.
+        :raises ValueError: If no orders are matched for a MARKET order, or if the id of a LIMIT
+            order is already resting in the book.
         """
-        if order.type == OrderType.MARKET:
+        if order.type is MARKET:
             orders, partially_filled_orders =  self._match_market_order(order)
             orders.extend(partially_filled_orders)
             if len(orders) == 0:
                 raise ValueError("No orders matched")
+            self._forget_filled(orders)
             return order, orders
         else:
+            if order.id in self._by_id:
+                raise ValueError(f"Order {order.id} is already resting in the book")
             order, matched_orders, remain_qty = self._match_limit_order(order)
+            self._forget_filled(matched_orders)
             if remain_qty > 0:
-                if order.side == OrderSide.BUY:
+                if order.side is BUY:
                     self._add_bid(order)
                 else:
                     self._add_ask(order)
+            return order, matched_orders
+
+    def cancel(self, order_id: str) -> Optional[Order]:
+        """
+        Cancels a resting order by id. The order's price level is found through the id index
+        kept by the book, and the order is cleared from its queue in place. A level left
+        without resting orders is removed from the book.
+
+        :param order_id: The id of the order to cancel.
+        :type order_id: str
+        :return: The cancelled order with its unfilled quantity, or None if no order with that
+            id is resting in the book.
+        :rtype: Optional[Order]
+        """
+        order = self._by_id.pop(order_id, None)
+        if order is None:
+            return None
+        levels = self.bids if order.side is BUY else self.asks
+        ticks = self.limit_to_ticks(order.price, order.side)
+        level = levels.get(ticks)
+        if level is None:
+            return None
+        cancelled = level.cancel(order_id)
+        if cancelled is not None and level.is_empty():
+            if order.side is BUY:
+                self._remove_bid(ticks)
+            else:
+                self._remove_ask(ticks)
+        return cancelled
+
+    def _forget_filled(self, matched_orders: List[Order]) -> None:
+        """
+        Drops the completely filled orders of a match from the id index. Partially filled
+        orders are reported as copies while the original keeps resting, so only entries
+        pointing at the very same object are dropped.
+
+        :param matched_orders: The orders returned by a match.
+        :type matched_orders: List[Order]
+        :return: None
+        """
+        by_id = self._by_id
+        for matched in matched_orders:
+            if by_id.get(matched.id) is matched:
+                del by_id[matched.id]
+
+    def match_from(self, ring: SPSCRing[Order]) -> List[Tuple[Order, List[Order]]]:
+        """
+        Consumes every order currently queued in the ring and matches them in arrival order.
+        The order book is meant to be the single consumer of its ring, so matching never
+        contends with the producers feeding it. Market orders that find no liquidity and
+        limit orders rejected for a resting id are reported with an empty list of matched
+        orders instead of raising.
+
+        :param ring: The single-producer single-consumer ring feeding this order book.
+        :type ring: SPSCRing[Order]
+        :return: A list with the result of `match` for each consumed order.
+        :rtype: List[Tuple[Order, List[Order]]]
+        """
+        results = []
+        while (order := ring.try_pop()) is not None:
+            try:
+                results.append(self.match(order))
+            except ValueError:
+                results.append((order, []))
+        return results
+
+    def match_batch(self, orders: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Matches a batch of incoming orders, given as a structured array with the ``ORDER_DT``
+        layout, in array order. The batch is converted to Python rows in a single call and the
+        enum fields are decoded by indexing, so replaying a batch avoids building the orders
+        one by one on the caller's side. As in `match_from`, market orders that find no
+        liquidity are reported as unfilled instead of raising, and the remainder of limit
+        orders rests in the book under the stringified batch id. Results are reported by id,
+        so the ids of a batch must be unique and must not belong to an order already resting
+        in the book.
+
+        :param orders: The incoming orders, with the ``ORDER_DT`` dtype.
+        :type orders: np.ndarray
+        :return: A tuple with the ids and filled quantities of the incoming orders that were
+            (partially) filled, followed by the ids and unfilled quantities of the ones with
+            quantity left. Both are taken at the end of the batch, so fills a resting remainder
+            receives from later orders of the same batch are included.
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        :raises ValueError: If the array does not have the ``ORDER_DT`` dtype, or if an id is
+            repeated in the batch or already resting in the book. Nothing is matched then.
+        """
+        if orders.dtype != ORDER_DT:
+            raise ValueError(f"Expected an array with the ORDER_DT dtype, got {orders.dtype}")
+        ids = orders["id"]
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("Order ids in a batch must be unique")
+        by_id = self._by_id
+        if any(str(order_id) in by_id for order_id in ids.tolist()):
+            raise ValueError("Order ids in a batch must not be resting in the book")
 
+        batch = []
+        symbol = self.symbol
+        for order_id, price, quantity, timestamp, side, position, order_type in orders.tolist():
+            order_type = ORDER_TYPES[order_type]
+            order = Order(str(order_id), symbol, order_type, ORDER_SIDES[side], POSITIONS[position],
+                          quantity, timestamp, price if order_type is LIMIT else None)
+            try:
+                self.match(order)
+            except ValueError:
+                pass
+            batch.append(order)
 
+        # Filled resting orders keep their last quantity, so only the ones still indexed count
+        remaining = np.fromiter(
+            (order.quantity if order.type is MARKET or by_id.get(order.id) is order else 0 for order in batch),
+            dtype=np.int64, count=len(batch))
+        filled = orders["qty"] - remaining
+        filled_mask, remaining_mask = filled > 0, remaining > 0
+        return ids[filled_mask], filled[filled_mask], ids[remaining_mask], remaining[remaining_mask]
+
+    def _new_level(self, ticks: int) -> PriceLevel:
+        """
+        Returns an empty price level for the given tick, reusing a level released by
+        `_release_level` when one is available. The level's price is the tick's price, so
+        orders entered off the tick grid do not leak their unrounded price into the book.
+
+        :param ticks: The price of the new level in ticks.
+        :type ticks: int
+        :return: An empty price level at the given tick.
+        :rtype: PriceLevel
+        """
+        price = self.ticks_to_price(ticks)
+        if self._level_pool:
+            level = self._level_pool.pop()
+            level.price = price
+            return level
+        return PriceLevel(price, self.symbol)
+
+    def _release_level(self, level: PriceLevel) -> None:
+        """
+        Resets a price level removed from the book and keeps it for reuse, unless the pool
+        is already full, in which case the level is left to the garbage collector.
+
+        :param level: The removed price level.
+        :type level: PriceLevel
+        :return: None
+        """
+        if len(self._level_pool) < _LEVEL_POOL_SIZE:
+            level.reset()
+            self._level_pool.append(level)
 
     def _add_bid(self, order: Order):
         """
@@ -86,9 +302,19 @@ class OrderBook(MatchingEngine, ABC):
 
         :return: None
         """
-        if order.price not in self.bids:
-            self.bids[order.price] = PriceLevel(order.price, self.symbol)
-        self.bids[order.price].add_order(order)
+        ticks = self.limit_to_ticks(order.price, BUY)
+        level = self.bids.get(ticks)
+        if level is None:
+            level = self.bids[ticks] = self._new_level(ticks)
+            if ticks in self._bid_tombstones:
+                self._bid_tombstones.discard(ticks)  # Its heap entry is still in place
+            else:
+                heapq.heappush(self._bid_heap, -ticks)
+            if self._best_bid_ticks is None or ticks > self._best_bid_ticks:
+                self._best_bid_ticks = ticks
+                self._best_bid = (level.price, level)
+        level.add_order(order)
+        self._by_id[order.id] = order
 
     def _add_ask(self, order: Order):
         """
@@ -99,49 +325,134 @@ class OrderBook(MatchingEngine, ABC):
         :param order: The ask order to be added to the order book
         :type order: Order
         """
-        if order.price not in self.asks:
-            self.asks[order.price] = PriceLevel(order.price, self.symbol)
-        self.asks[order.price].add_order(order)
+        ticks = self.limit_to_ticks(order.price, SELL)
+        level = self.asks.get(ticks)
+        if level is None:
+            level = self.asks[ticks] = self._new_level(ticks)
+            if ticks in self._ask_tombstones:
+                self._ask_tombstones.discard(ticks)  # Its heap entry is still in place
+            else:
+                heapq.heappush(self._ask_heap, ticks)
+            if self._best_ask_ticks is None or ticks < self._best_ask_ticks:
+                self._best_ask_ticks = ticks
+                self._best_ask = (level.price, level)
+        level.add_order(order)
+        self._by_id[order.id] = order
+
+    def _remove_bid(self, ticks: int) -> None:
+        """
+        Removes the bid price level at the given tick from the bid price level map and
+        marks its heap entry as a tombstone. If the removed level was the best bid, stale
+        entries are popped from the top of the heap to refresh the cached best bid. The
+        heap is rebuilt once tombstones outnumber the remaining levels, which keeps it
+        within twice the size of the bid side.
+
+        :param ticks: The price of the bid level to remove, in ticks.
+        :type ticks: int
+        :return: None
+        """
+        self._release_level(self.bids.pop(ticks))
+        heap, tombstones = self._bid_heap, self._bid_tombstones
+        tombstones.add(ticks)
+        if ticks == self._best_bid_ticks:
+            while heap and -heap[0] in tombstones:
+                tombstones.discard(-heapq.heappop(heap))
+            if heap:
+                self._best_bid_ticks = -heap[0]
+                level = self.bids[self._best_bid_ticks]
+                self._best_bid = (level.price, level)
+            else:
+                self._best_bid_ticks = self._best_bid = None
+        if len(tombstones) > len(self.bids):
+            self._bid_heap = [-live for live in self.bids]
+            heapq.heapify(self._bid_heap)
+            tombstones.clear()
+
+    def _remove_ask(self, ticks: int) -> None:
+        """
+        Removes the ask price level at the given tick from the ask price level map and
+        marks its heap entry as a tombstone. If the removed level was the best ask, stale
+        entries are popped from the top of the heap to refresh the cached best ask. The
+        heap is rebuilt once tombstones outnumber the remaining levels, which keeps it
+        within twice the size of the ask side.
+
+        :param ticks: The price of the ask level to remove, in ticks.
+        :type ticks: int
+        :return: None
+        """
+        self._release_level(self.asks.pop(ticks))
+        heap, tombstones = self._ask_heap, self._ask_tombstones
+        tombstones.add(ticks)
+        if ticks == self._best_ask_ticks:
+            while heap and heap[0] in tombstones:
+                tombstones.discard(heapq.heappop(heap))
+            if heap:
+                self._best_ask_ticks = heap[0]
+                level = self.asks[self._best_ask_ticks]
+                self._best_ask = (level.price, level)
+            else:
+                self._best_ask_ticks = self._best_ask = None
+        if len(tombstones) > len(self.asks):
+            self._ask_heap = list(self.asks)
+            heapq.heapify(self._ask_heap)
+            tombstones.clear()
+
+    def _iter_asks(self) -> Iterator[Tuple[int, PriceLevel]]:
+        """
+        Yields the ask levels from the lowest price upwards by walking the ask heap in place.
+
+        :return: An iterator over (ticks, PriceLevel) tuples in priority order.
+        :rtype: Iterator[Tuple[int, PriceLevel]]
+        """
+        return _walk_heap(self._ask_heap, self.asks, 1)
+
+    def _iter_bids(self) -> Iterator[Tuple[int, PriceLevel]]:
+        """
+        Yields the bid levels from the highest price downwards by walking the bid heap in place.
+
+        :return: An iterator over (ticks, PriceLevel) tuples in priority order.
+        :rtype: Iterator[Tuple[int, PriceLevel]]
+        """
+        return _walk_heap(self._bid_heap, self.bids, -1)
 
     def get_best_bid(self) -> Optional[Tuple[float, PriceLevel]]:
         """
-        Retrieve the best bid from the bids dictionary. The method removes and returns the
-        highest bid in the dictionary, if available. If the bids dictionary is empty, it
-        returns None.
+        Retrieve the best bid from the bids dictionary without removing it. The highest bid
+        is cached together with its level as levels are added and removed, so this is a
+        single attribute load. If the bids dictionary is empty, it returns None.
 
         :return: A tuple containing the price (float) and the price level (PriceLevel)
             of the best available bid, or None if no bids exist.
         :rtype: Optional[Tuple[float, PriceLevel]]
         """
-        return self.bids.popitem(last=True) if self.bids else None
+        return self._best_bid
 
     def get_best_ask(self) -> Optional[Tuple[float, PriceLevel]]:
         """
-        Retrieves and removes the lowest price level from the ordered dictionary of asks. If no asks
-        are available, returns None.
+        Retrieves the lowest price level from the dictionary of asks without removing it.
+        The lowest ask is cached together with its level as levels are added and removed,
+        so this is a single attribute load. If no asks are available, returns None.
 
         :return: A tuple containing the price and corresponding ``PriceLevel`` object if available,
                  otherwise ``None``.
         :rtype: Optional[Tuple[float, PriceLevel]]
         """
-        return self.asks.popitem(last=False) if self.asks else None
+        return self._best_ask
 
     def get_spread(self) -> Optional[Tuple[float, float]]:
         """
         Calculate the spread between the best bid and the best ask prices.
 
-        This function retrieves the highest bid price and the lowest ask price
-        using the `get_best_bid` and `get_best_ask` methods, respectively. If
-        either the bid or ask prices are unavailable, the function will return
-        None. Otherwise, it returns the spread as a tuple containing the
-        best ask price and best bid price.
+        This function reads the cached highest bid and lowest ask. If either the
+        bid or ask prices are unavailable, the function will return None.
+        Otherwise, it returns the spread as a tuple containing the best ask
+        price and best bid price.
 
         :return: A tuple containing the best ask and best bid prices, or None
             if either value is unavailable.
         :rtype: Optional[Tuple[float, float]]
         """
-        best_bid = self.get_best_bid()
-        best_ask = self.get_best_ask()
-        if not best_bid or not best_ask:
+        best_bid, best_ask = self._best_bid, self._best_ask
+        if best_bid is None or best_ask is None:
             return None
         return best_ask[0], best_bid[0]
@@ -1,12 +1,28 @@
-from ..models.order import OrderSide, Position, Order
+from itertools import product
+
+import numpy as np
+
+from ..models.order import Order, OrderSide, Position
+
+# Validity of every (side1, position1, side2, position2) combination, indexed by the
+# four 0/1 fields packed into a 4-bit integer. Two orders match when they sit on
+# opposite sides and hold opposite positions.
+_VALID = bytes(
+    (side1 != side2) and (position1 != position2)
+    for side1, position1, side2, position2 in product(OrderSide, Position, OrderSide, Position)
+)
+# The same table as a NumPy array, to be fancy-indexed by `are_valid_matches`
+VALID_TABLE = np.frombuffer(_VALID, dtype=np.uint8)
 
 
 def is_valid_match(order1: Order, order2: Order) -> bool:
     """
     Determines if two orders are a valid match based on their side and position.
     A valid match occurs when the combination of side and position from `order1`
-    is a corresponding inverse of the combination from `order2` as defined by
-    the `valid_matches` mapping.
+    is the inverse of the combination from `order2`, that is, the orders sit on
+    opposite sides and hold opposite positions. Since sides and positions are
+    backed by 0/1 integers, the four fields are packed into an index into a
+    precomputed table of all sixteen combinations.
 
     :param order1: The first order to compare.
     :type order1: Order
@@ -15,10 +31,25 @@ def is_valid_match(order1: Order, order2: Order) -> bool:
     :return: True if the orders form a valid match, False otherwise.
     :rtype: bool
     """
-    valid_matches = {
-        (OrderSide.BUY, Position.LONG): (OrderSide.SELL, Position.SHORT),
-        (OrderSide.SELL, Position.LONG): (OrderSide.BUY, Position.SHORT),
-        (OrderSide.BUY, Position.SHORT): (OrderSide.SELL, Position.LONG),
-        (OrderSide.SELL, Position.SHORT): (OrderSide.BUY, Position.LONG)
-    }
-    return valid_matches.get((order1.side, order1.position)) == (order2.side, order2.position)
\ No newline at end of file
+    return bool(_VALID[(order1.side << 3) | (order1.position << 2) | (order2.side << 1) | order2.position])
+
+
+def are_valid_matches(side: OrderSide, position: Position, sides: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    Vectorized counterpart of `is_valid_match`, checking one order against many. The packed
+    table indices of all the candidates are computed with array operations and looked up
+    in `VALID_TABLE` with a single fancy index.
+
+    :param side: The side of the order the candidates are matched against.
+    :type side: OrderSide
+    :param position: The position of the order the candidates are matched against.
+    :type position: Position
+    :param sides: The 0/1 side values of the candidate orders.
+    :type sides: np.ndarray
+    :param positions: The 0/1 position values of the candidate orders, aligned with `sides`.
+    :type positions: np.ndarray
+    :return: A boolean array telling which candidates form a valid match with the order.
+    :rtype: np.ndarray
+    """
+    index = (int(side) << 3) | (int(position) << 2) | (np.asarray(sides, dtype=np.intp) << 1) | positions
+    return VALID_TABLE[index].astype(bool)
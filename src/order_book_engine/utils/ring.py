@@ -0,0 +1,67 @@
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SPSCRing(Generic[T]):
+    """
+    Bounded single-producer single-consumer ring buffer.
+
+    Matching is single-writer by nature, so each order book can be fed from its own
+    ring: producers push incoming orders and the matching thread pops them in arrival
+    order, without either side taking a lock. The write cursor is only ever advanced by
+    the producer and the read cursor only by the consumer, and a slot is published by
+    advancing the write cursor after the slot has been stored. Under CPython's GIL each
+    of these steps is atomic, which is what makes the buffer safe with exactly one
+    producer thread and one consumer thread.
+
+    :ivar capacity: Number of slots in the ring. Must be a power of two so that a cursor
+        maps to its slot with a bit mask.
+    :type capacity: int
+    """
+
+    def __init__(self, capacity: int = 1 << 16):
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError("Ring capacity must be a power of two")
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._slots = [None] * capacity
+        self._write_idx = 0
+        self._read_idx = 0
+
+    def __len__(self) -> int:
+        return self._write_idx - self._read_idx
+
+    def try_push(self, item: T) -> bool:
+        """
+        Stores an item at the write cursor if the ring has a free slot. Must only be
+        called from the producer.
+
+        :param item: The item to enqueue.
+        :type item: T
+        :return: True if the item was enqueued, False if the ring is full.
+        :rtype: bool
+        """
+        write_idx = self._write_idx
+        if write_idx - self._read_idx == self.capacity:
+            return False
+        self._slots[write_idx & self._mask] = item
+        self._write_idx = write_idx + 1
+        return True
+
+    def try_pop(self) -> Optional[T]:
+        """
+        Takes the item at the read cursor if the ring is not empty. Must only be called
+        from the consumer.
+
+        :return: The oldest item in the ring, or None if the ring is empty.
+        :rtype: Optional[T]
+        """
+        read_idx = self._read_idx
+        if read_idx == self._write_idx:
+            return None
+        slot = read_idx & self._mask
+        item = self._slots[slot]
+        self._slots[slot] = None
+        self._read_idx = read_idx + 1
+        return item
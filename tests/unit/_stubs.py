@@ -0,0 +1,12 @@
+class LevelsStub:
+    """
+    Callable that returns a fresh iterator over the given (ticks, level) tuples on every call.
+    Stands in for the engine's level walks (``_iter_asks``/``_iter_bids``) without a
+    ``MagicMock``, whose bookkeeping would dominate a profile of the suite.
+    """
+
+    def __init__(self, levels):
+        self._levels = list(levels)
+
+    def __call__(self, *args, **kwargs):
+        return iter(self._levels)
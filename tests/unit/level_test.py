@@ -1,8 +1,11 @@
+import time
 import unittest
-from datetime import datetime
 from copy import deepcopy
 from src.order_book_engine.models.order import Order, Position, OrderSide, OrderType
-from src.order_book_engine.models.level import PriceLevel
+import numpy as np
+
+from src.order_book_engine.models._matching_kernels import _get_qty_loop, _get_qty_vectorized
+from src.order_book_engine.models.level import PriceLevel, OrderQueue
 
 
 class TestPriceLevel(unittest.TestCase):
@@ -17,7 +20,7 @@ class TestPriceLevel(unittest.TestCase):
             position=Position.LONG,
             price=100.0,
             quantity=5,
-            timestamp=datetime.now()
+            timestamp=time.time_ns()
         )
         self.short_order = Order(
             id="2",
@@ -27,7 +30,7 @@ class TestPriceLevel(unittest.TestCase):
             position=Position.SHORT,
             price=100.0,
             quantity=3,
-            timestamp=datetime.now()
+            timestamp=time.time_ns()
         )
 
     def test_add_order(self):
@@ -45,7 +48,8 @@ class TestPriceLevel(unittest.TestCase):
 
     def test_get_qty_full_fill(self):
         self.price_level.add_order(self.long_order)
-        filled, partial, remaining = self.price_level.get_qty(5, Position.LONG)
+        filled = []
+        partial, remaining = self.price_level.get_qty(5, Position.LONG, filled)
 
         self.assertEqual(len(filled), 1)
         self.assertIsNone(partial)
@@ -54,7 +58,8 @@ class TestPriceLevel(unittest.TestCase):
 
     def test_get_qty_partial_fill(self):
         self.price_level.add_order(self.long_order)
-        filled, partial, remaining = self.price_level.get_qty(3, Position.LONG)
+        filled = []
+        partial, remaining = self.price_level.get_qty(3, Position.LONG, filled)
 
         self.assertEqual(len(filled), 0)
         self.assertEqual(partial.quantity, 3)
@@ -68,7 +73,9 @@ class TestPriceLevel(unittest.TestCase):
         self.price_level.add_order(self.long_order)
         self.price_level.add_order(order2)
 
-        filled, partial, remaining = self.price_level.get_qty(7, Position.LONG)
+        filled = []
+
+        partial, remaining = self.price_level.get_qty(7, Position.LONG, filled)
 
         self.assertEqual(len(filled), 1)
         self.assertEqual(partial.quantity, 2)
@@ -78,7 +85,8 @@ class TestPriceLevel(unittest.TestCase):
 
     def test_get_qty_short_full_fill(self):
         self.price_level.add_order(self.short_order)
-        filled, partial, remaining = self.price_level.get_qty(3, Position.SHORT)
+        filled = []
+        partial, remaining = self.price_level.get_qty(3, Position.SHORT, filled)
 
         self.assertEqual(len(filled), 1)
         self.assertIsNone(partial)
@@ -88,7 +96,8 @@ class TestPriceLevel(unittest.TestCase):
 
     def test_get_qty_short_partial_fill(self):
         self.price_level.add_order(self.short_order)
-        filled, partial, remaining = self.price_level.get_qty(2, Position.SHORT)
+        filled = []
+        partial, remaining = self.price_level.get_qty(2, Position.SHORT, filled)
 
         self.assertEqual(len(filled), 0)
         self.assertEqual(partial.quantity, 2)
@@ -103,7 +112,9 @@ class TestPriceLevel(unittest.TestCase):
         self.price_level.add_order(self.short_order)
         self.price_level.add_order(order2)
 
-        filled, partial, remaining = self.price_level.get_qty(4, Position.SHORT)
+        filled = []
+
+        partial, remaining = self.price_level.get_qty(4, Position.SHORT, filled)
 
         self.assertEqual(len(filled), 1)
         self.assertEqual(partial.quantity, 1)
@@ -113,7 +124,7 @@ class TestPriceLevel(unittest.TestCase):
     def test_str_representation(self):
         price_level = PriceLevel(10.5, self.symbol)
         str_output = str(price_level)
-        expected = "price=10.5, long_orders=deque([]), short_orders=deque([]))"
+        expected = "price=10.5, long_orders=OrderQueue([]), short_orders=OrderQueue([]))"
         self.assertEqual(str_output, expected)
 
     def test_repr(self):
@@ -124,5 +135,169 @@ class TestPriceLevel(unittest.TestCase):
 
     def test_can_match_empty_queue(self):
         price_level = PriceLevel(10.5, self.symbol)
-        order = Order("1", self.symbol, OrderType.LIMIT, OrderSide.BUY, Position.LONG, 100, datetime.now(), 10.5)
-        self.assertFalse(price_level.can_match(order))
\ No newline at end of file
+        order = Order("1", self.symbol, OrderType.LIMIT, OrderSide.BUY, Position.LONG, 100, time.time_ns(), 10.5)
+        self.assertFalse(price_level.can_match(order))
+
+    def test_is_empty(self):
+        self.assertTrue(self.price_level.is_empty())
+        self.price_level.add_order(self.short_order)
+        self.assertFalse(self.price_level.is_empty())
+        self.price_level.get_qty(3, Position.SHORT, [])
+        self.assertTrue(self.price_level.is_empty())
+
+    def test_cancel_updates_totals(self):
+        self.price_level.add_order(self.long_order)
+        self.price_level.add_order(self.short_order)
+
+        self.assertIs(self.price_level.cancel("2"), self.short_order)
+        self.assertEqual(self.price_level.short_total, 0)
+        self.assertEqual(self.price_level.long_total, 5)
+        self.assertIsNone(self.price_level.cancel("2"))
+
+    def test_reset_empties_level(self):
+        self.price_level.add_order(self.long_order)
+        self.price_level.add_order(self.short_order)
+
+        self.price_level.reset()
+
+        self.assertTrue(self.price_level.is_empty())
+        self.assertEqual((self.price_level.long_total, self.price_level.short_total), (0, 0))
+
+    def test_get_qty_partial_fill_returns_independent_order(self):
+        self.price_level.add_order(self.long_order)
+        partial, _ = self.price_level.get_qty(3, Position.LONG, [])
+
+        self.assertIsNot(partial, self.long_order)
+        self.assertEqual(partial.id, self.long_order.id)
+        self.assertEqual(partial.timestamp, self.long_order.timestamp)
+        self.assertEqual(partial.quantity, 3)
+        self.assertEqual(self.long_order.quantity, 2)
+
+    def test_get_qty_sweeps_whole_queue(self):
+        order2 = deepcopy(self.short_order)
+        order2.id = "3"
+        self.price_level.add_order(self.short_order)
+        self.price_level.add_order(order2)
+
+        filled = []
+        partial, remaining = self.price_level.get_qty(10, Position.SHORT, filled)
+
+        self.assertEqual([order.id for order in filled], ["2", "3"])
+        self.assertIsNone(partial)
+        self.assertEqual(remaining, 4)
+        self.assertEqual(self.price_level.short_total, 0)
+        self.assertEqual(len(self.price_level.short_orders), 0)
+
+
+class TestOrderQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = OrderQueue(capacity=2)
+
+    def _order(self, order_id, quantity):
+        return Order(order_id, "GCQ4", OrderType.LIMIT, OrderSide.SELL, Position.SHORT,
+                     quantity, time.time_ns(), 100.0)
+
+    def test_queue_uses_slots(self):
+        self.assertFalse(hasattr(self.queue, "__dict__"))
+
+    def test_append_grows_capacity(self):
+        for i in range(5):
+            self.queue.append(self._order(str(i), 1))
+
+        self.assertEqual(len(self.queue), 5)
+        self.assertGreaterEqual(self.queue.capacity, 5)
+        self.assertEqual([order.id for order in self.queue], ["0", "1", "2", "3", "4"])
+
+    def test_take_keeps_fifo_order_after_compaction(self):
+        self.queue.append(self._order("1", 2))
+        self.queue.append(self._order("2", 2))
+        self.queue.take(2, [])
+        self.queue.append(self._order("3", 2))
+
+        filled = []
+        partial, remaining = self.queue.take(3, filled)
+
+        self.assertEqual([order.id for order in filled], ["2"])
+        self.assertEqual((partial.id, partial.quantity), ("3", 1))
+        self.assertEqual(remaining, 0)
+        self.assertEqual(self.queue[0].quantity, 1)
+
+    def test_take_more_than_available(self):
+        self.queue.append(self._order("1", 2))
+        self.queue.append(self._order("2", 3))
+
+        filled = []
+        partial, remaining = self.queue.take(10, filled)
+
+        self.assertEqual(len(filled), 2)
+        self.assertIsNone(partial)
+        self.assertEqual(remaining, 5)
+        self.assertEqual(len(self.queue), 0)
+
+
+    def test_take_releases_filled_orders(self):
+        first = self._order("1", 2)
+        self.queue.append(first)
+        self.queue.append(self._order("2", 2))
+
+        self.queue.take(2, [])
+
+        self.assertNotIn(first, self.queue._orders)
+
+    def test_cancel_skips_slot_when_taking(self):
+        for order_id in ("1", "2", "3"):
+            self.queue.append(self._order(order_id, 2))
+
+        cancelled = self.queue.cancel("2")
+        filled = []
+        partial, remaining = self.queue.take(3, filled)
+
+        self.assertEqual(cancelled.id, "2")
+        self.assertEqual([order.id for order in filled], ["1"])
+        self.assertEqual((partial.id, partial.quantity), ("3", 1))
+        self.assertEqual(remaining, 0)
+        self.assertEqual(len(self.queue), 1)
+
+    def test_cancel_head_and_unknown_ids(self):
+        self.queue.append(self._order("1", 2))
+        self.queue.append(self._order("2", 2))
+
+        self.assertEqual(self.queue.cancel("1").id, "1")
+        self.assertIsNone(self.queue.cancel("1"))
+        self.assertIsNone(self.queue.cancel("missing"))
+        self.assertEqual(self.queue[0].id, "2")
+        self.assertEqual(len(self.queue), 1)
+
+    def test_compaction_drops_cancelled_slots(self):
+        for order_id in ("1", "2"):
+            self.queue.append(self._order(order_id, 2))
+        self.queue.append(self._order("3", 2))
+        self.queue.append(self._order("4", 2))
+        self.queue.cancel("2")
+        self.queue.append(self._order("5", 2))
+
+        self.assertEqual(self.queue._orders[:4], [order for order in self.queue])
+        self.assertEqual([order.id for order in self.queue], ["1", "3", "4", "5"])
+        self.assertEqual(self.queue.cancel("4").id, "4")
+        self.assertEqual([order.id for order in self.queue], ["1", "3", "5"])
+
+
+class TestGetQtyKernels(unittest.TestCase):
+    def test_loop_and_vectorized_kernels_agree(self):
+        quantities = [3, 1, 4, 1, 5]
+        for requested in range(0, 17):
+            loop_qty = np.array([0] + quantities, dtype=np.int64)
+            vectorized_qty = loop_qty.copy()
+
+            loop_result = _get_qty_loop(loop_qty, 1, len(loop_qty), requested)
+            vectorized_result = _get_qty_vectorized(vectorized_qty, 1, len(vectorized_qty), requested)
+
+            self.assertEqual(tuple(map(int, loop_result)), tuple(map(int, vectorized_result)))
+            self.assertEqual(loop_qty.tolist(), vectorized_qty.tolist())
+
+    def test_kernel_partial_fill(self):
+        qty = np.array([2, 5], dtype=np.int64)
+        new_head, partial_qty, remaining_qty = _get_qty_loop(qty, 0, 2, 4)
+
+        self.assertEqual((new_head, partial_qty, remaining_qty), (1, 2, 0))
+        self.assertEqual(qty.tolist(), [2, 3])
@@ -1,23 +1,32 @@
+import time
 import unittest
-from collections import OrderedDict
-from datetime import datetime
 from unittest.mock import MagicMock, patch
 
+from tests.unit._stubs import LevelsStub
+
 from src.order_book_engine.models.level import PriceLevel
 from src.order_book_engine.models.matching_engine import MatchingEngine
 from src.order_book_engine.models.order import Order, OrderType, OrderSide, Position
 
 
+def mock_get_qty(filled_orders, partial_order, remaining_qty):
+    """Mocks PriceLevel.get_qty, appending `filled_orders` to the caller's output list."""
+    def get_qty(requested_quantity, position, out_filled):
+        out_filled.extend(filled_orders)
+        return partial_order, remaining_qty
+    return MagicMock(side_effect=get_qty)
+
+
 class TestMatchingEngine(unittest.TestCase):
     def setUp(self):
         self.engine = MockMatchingEngine("GCQ4")
-        self.timestamp = datetime.now()
+        self.timestamp = time.time_ns()
         self.mock_level = PriceLevel(100, "GCQ4")
-        self.mock_level.get_qty = MagicMock(return_value=([Order(
+        self.mock_level.get_qty = mock_get_qty([Order(
             id="2", symbol="GCQ4", type=OrderType.LIMIT,
             side=OrderSide.SELL, position=Position.SHORT,
             quantity=10, price=100, timestamp=self.timestamp
-        )], None, 0))
+        )], None, 0)
 
     def test_match_market_buy_long_order(self):
         order = Order(
@@ -34,10 +43,9 @@ class TestMatchingEngine(unittest.TestCase):
         mock_price_level = PriceLevel(100, "GCQ4")
 
         # Configurar mock para devolver filled_orders, partial y no quantity restante
-        mock_price_level.get_qty = MagicMock(return_value=([], None, 0))
+        mock_price_level.get_qty = mock_get_qty([], None, 0)
 
-        # Solo devuelve el mock una vez, luego None
-        self.engine.get_best_ask = MagicMock(side_effect=[(100, mock_price_level), None])
+        self.engine._iter_asks = LevelsStub([(10000, mock_price_level)])
 
         filled, partial = self.engine._match_market_order(order)
         self.assertEqual(len(filled), 0)
@@ -67,8 +75,8 @@ class TestMatchingEngine(unittest.TestCase):
         )
 
         mock_level = PriceLevel(100, "GCQ4")
-        mock_level.get_qty = MagicMock(return_value=([filled_order], None, 0))
-        self.engine.get_best_bid = MagicMock(return_value=(100, mock_level))
+        mock_level.get_qty = mock_get_qty([filled_order], None, 0)
+        self.engine._iter_bids = LevelsStub([(10000, mock_level)])
 
         filled, partial = self.engine._match_market_order(order)
         self.assertEqual(len(filled), 1)
@@ -86,11 +94,9 @@ class TestMatchingEngine(unittest.TestCase):
             timestamp=self.timestamp
         )
 
-        asks = {100: MagicMock()}
-        bids = {80: MagicMock()}
+        self.engine._iter_asks = LevelsStub([(10000, MagicMock())])
 
-        matched_order, matched, remaining = self.engine._match_limit_order(
-            order, asks, bids)
+        matched_order, matched, remaining = self.engine._match_limit_order(order)
 
         self.assertEqual(remaining, 10)
         self.assertEqual(len(matched), 0)
@@ -119,23 +125,19 @@ class TestMatchingEngine(unittest.TestCase):
         )
 
         mock_level = PriceLevel(100, "GCQ4")
-        mock_level.get_qty = MagicMock(return_value=([filled_order], None, 5))
+        mock_level.get_qty = mock_get_qty([filled_order], None, 5)
 
-        asks = {100: mock_level}
-        bids = {}
-
-        matched_order, matched, remaining = self.engine._match_limit_order(
-            order, asks, bids)
+        matched_order, matched, remaining = self.engine._match_limit_order(order)
 
         self.assertEqual(remaining, 10)
         self.assertEqual(len(matched), 0)
 
     def test_mock_matching_engine(self):
         mock_level = PriceLevel(100, "GCQ4")
-        mock_level.get_qty = MagicMock(return_value=([], None, 0))
+        mock_level.get_qty = mock_get_qty([], None, 0)
 
-        self.engine.get_best_ask = MagicMock(side_effect=[(100, mock_level), None])
-        self.engine.get_best_bid = MagicMock(side_effect=[(99, mock_level), None])
+        self.engine._iter_asks = LevelsStub([(10000, mock_level)])
+        self.engine._iter_bids = LevelsStub([(9900, mock_level)])
 
         order = Order(
             id="1",
@@ -151,6 +153,13 @@ class TestMatchingEngine(unittest.TestCase):
         self.assertEqual(len(filled), 0)
         self.assertEqual(len(partial), 0)
 
+    def test_base_engine_methods_not_implemented(self):
+        engine = MatchingEngine("GCQ4")
+        with self.assertRaises(NotImplementedError):
+            engine.get_best_ask()
+        with self.assertRaises(NotImplementedError):
+            engine._remove_bid(10000)
+
     def test_match_market_order_buy_long(self):
         order = Order(
             id="1", symbol="GCQ4", type=OrderType.MARKET,
@@ -158,7 +167,7 @@ class TestMatchingEngine(unittest.TestCase):
             quantity=10, timestamp=self.timestamp
         )
 
-        self.engine.get_best_ask = MagicMock(side_effect=[(100, self.mock_level), None])
+        self.engine._iter_asks = LevelsStub([(10000, self.mock_level)])
         filled, partial = self.engine._match_market_order(order)
 
         self.assertEqual(len(filled), 1)
@@ -171,7 +180,7 @@ class TestMatchingEngine(unittest.TestCase):
             quantity=10, timestamp=self.timestamp
         )
 
-        self.engine.get_best_ask = MagicMock(side_effect=[(100, self.mock_level), None])
+        self.engine._iter_asks = LevelsStub([(10000, self.mock_level)])
         filled, partial = self.engine._match_market_order(order)
         self.assertEqual(len(filled), 1)
 
@@ -182,7 +191,7 @@ class TestMatchingEngine(unittest.TestCase):
             quantity=10, timestamp=self.timestamp
         )
 
-        self.engine.get_best_bid = MagicMock(side_effect=[(100, self.mock_level), None])
+        self.engine._iter_bids = LevelsStub([(10000, self.mock_level)])
         filled, partial = self.engine._match_market_order(order)
         self.assertEqual(len(filled), 1)
 
@@ -200,19 +209,31 @@ class TestMatchingEngine(unittest.TestCase):
         )
 
         mock_level = PriceLevel(99, "GCQ4")
-        mock_level.get_qty = MagicMock(return_value=([ask_order], None, 0))
+        mock_level.get_qty = mock_get_qty([ask_order], None, 0)
         order.quantity = 0  # Simulamos que la orden se ha ejecutado completamente
 
-        asks = OrderedDict({99: mock_level})
-        bids = OrderedDict()
+        self.engine._iter_asks = LevelsStub([(9900, mock_level)])
 
-        self.engine.get_best_ask = MagicMock(side_effect=[(99, mock_level), None])
-
-        updated_order, matched, remaining = self.engine._match_limit_order(order, asks, bids)
+        updated_order, matched, remaining = self.engine._match_limit_order(order)
         self.assertEqual(len(matched), 1)
         self.assertEqual(remaining, 0)
 
 
+    def test_match_limit_sell_short_consumes_long_bids(self):
+        order = Order(
+            id="1", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+            position=Position.SHORT, quantity=5, price=100, timestamp=self.timestamp
+        )
+        mock_level = PriceLevel(101, "GCQ4")
+        mock_level.get_qty = mock_get_qty([], None, 0)
+        self.engine._iter_bids = LevelsStub([(10100, mock_level)])
+
+        _, matched, remaining = self.engine._match_limit_order(order)
+
+        self.assertEqual(remaining, 0)
+        self.assertEqual(mock_level.get_qty.call_args.args[1], Position.LONG)
+
+
 class MockMatchingEngine(MatchingEngine):
     def match(self, order):
         pass
@@ -223,6 +244,18 @@ class MockMatchingEngine(MatchingEngine):
     def get_best_bid(self):
         pass
 
+    def _iter_asks(self):
+        return iter(())
+
+    def _iter_bids(self):
+        return iter(())
+
+    def _remove_ask(self, ticks):
+        pass
+
+    def _remove_bid(self, ticks):
+        pass
+
 
 
 
@@ -1,15 +1,18 @@
+import time
 import unittest
-from datetime import datetime
 from unittest.mock import MagicMock
 
-from src.order_book_engine.models.order import Order, OrderType, OrderSide, Position
-from src.order_book_engine.models.orderbook import OrderBook
+import numpy as np
+
+from src.order_book_engine.models.order import Order, OrderType, OrderSide, Position, ORDER_DT
+from src.order_book_engine.models.orderbook import OrderBook, _LEVEL_POOL_SIZE
+from src.order_book_engine.utils.ring import SPSCRing
 
 
 class TestOrderBook(unittest.TestCase):
     def setUp(self):
         self.order_book = OrderBook("GCQ4")
-        self.timestamp = datetime.now()
+        self.timestamp = time.time_ns()
 
     def test_add_bid_new_price_level(self):
         order = Order(
@@ -22,7 +25,7 @@ class TestOrderBook(unittest.TestCase):
             timestamp=self.timestamp
         )
         self.order_book._add_bid(order)
-        self.assertIn(100, self.order_book.bids)
+        self.assertIn(self.order_book.price_to_ticks(100), self.order_book.bids)
 
     def test_add_ask_new_price_level(self):
         order = Order(
@@ -35,7 +38,7 @@ class TestOrderBook(unittest.TestCase):
             timestamp=self.timestamp
         )
         self.order_book._add_ask(order)
-        self.assertIn(100, self.order_book.asks)
+        self.assertIn(self.order_book.price_to_ticks(100), self.order_book.asks)
 
     def test_get_best_bid_empty(self):
         self.assertIsNone(self.order_book.get_best_bid())
@@ -101,4 +104,389 @@ class TestOrderBook(unittest.TestCase):
         )
 
         self.order_book.match(limit_order)
-        self.assertIn(100, self.order_book.bids)
\ No newline at end of file
+        self.assertIn(self.order_book.price_to_ticks(100), self.order_book.bids)
+
+    def test_get_best_bid_and_ask_are_price_sorted(self):
+        for i, price in enumerate([99, 101, 100]):
+            self.order_book._add_bid(Order(
+                id=f"b{i}", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+                position=Position.LONG, quantity=10, price=price, timestamp=self.timestamp
+            ))
+            self.order_book._add_ask(Order(
+                id=f"a{i}", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+                position=Position.SHORT, quantity=10, price=price + 10, timestamp=self.timestamp
+            ))
+
+        self.assertEqual(self.order_book.get_best_bid()[0], 101)
+        self.assertEqual(self.order_book.get_best_ask()[0], 109)
+
+    def test_get_best_bid_and_ask_do_not_remove_levels(self):
+        self.order_book._add_bid(Order(
+            id="1", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+            position=Position.LONG, quantity=10, price=99, timestamp=self.timestamp
+        ))
+        self.order_book._add_ask(Order(
+            id="2", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+            position=Position.SHORT, quantity=10, price=100, timestamp=self.timestamp
+        ))
+
+        self.assertEqual(self.order_book.get_spread(), (100, 99))
+        self.assertEqual(self.order_book.get_spread(), (100, 99))
+        self.assertIn(self.order_book.price_to_ticks(99), self.order_book.bids)
+        self.assertIn(self.order_book.price_to_ticks(100), self.order_book.asks)
+
+    def test_best_prices_are_cached_tuples(self):
+        for order_id, price in [("1", 100), ("2", 99)]:
+            self.order_book._add_bid(Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+                position=Position.LONG, quantity=5, price=price, timestamp=self.timestamp
+            ))
+
+        best_bid = self.order_book.get_best_bid()
+        self.assertEqual(best_bid[0], 100)
+        self.assertIs(best_bid[1], self.order_book.bids[self.order_book.price_to_ticks(100)])
+        self.assertIs(self.order_book.get_best_bid(), best_bid)
+
+    def test_match_market_order_sweeps_levels(self):
+        for order_id, price, quantity in [("1", 100, 5), ("2", 101, 10)]:
+            self.order_book._add_ask(Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+                position=Position.SHORT, quantity=quantity, price=price, timestamp=self.timestamp
+            ))
+        order = Order(
+            id="3", symbol="GCQ4", type=OrderType.MARKET, side=OrderSide.BUY,
+            position=Position.LONG, quantity=8, timestamp=self.timestamp
+        )
+
+        _, matched = self.order_book.match(order)
+
+        self.assertEqual([(o.id, o.quantity) for o in matched], [("1", 5), ("2", 3)])
+        self.assertNotIn(self.order_book.price_to_ticks(100), self.order_book.asks)
+        self.assertEqual(self.order_book.asks[self.order_book.price_to_ticks(101)].short_total, 7)
+
+    def test_match_market_sell_order_sweeps_bid_levels(self):
+        for order_id, price in [("1", 99), ("2", 98)]:
+            self.order_book._add_bid(Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+                position=Position.LONG, quantity=5, price=price, timestamp=self.timestamp
+            ))
+        order = Order(
+            id="3", symbol="GCQ4", type=OrderType.MARKET, side=OrderSide.SELL,
+            position=Position.SHORT, quantity=10, timestamp=self.timestamp
+        )
+
+        _, matched = self.order_book.match(order)
+
+        self.assertEqual([o.id for o in matched], ["1", "2"])
+        self.assertEqual(order.quantity, 0)
+        self.assertIsNone(self.order_book.get_best_bid())
+
+    def test_match_limit_order_crosses_and_rests_remainder(self):
+        for order_id, price in [("1", 100), ("2", 101), ("3", 102)]:
+            self.order_book._add_ask(Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+                position=Position.SHORT, quantity=5, price=price, timestamp=self.timestamp
+            ))
+        order = Order(
+            id="4", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+            position=Position.LONG, quantity=12, price=101, timestamp=self.timestamp
+        )
+
+        _, matched = self.order_book.match(order)
+
+        self.assertEqual([o.id for o in matched], ["1", "2"])
+        self.assertEqual(self.order_book.get_best_ask()[0], 102)
+        self.assertEqual(self.order_book.get_best_bid()[0], 101)
+        self.assertEqual(self.order_book.bids[self.order_book.price_to_ticks(101)].long_total, 2)
+
+    def test_remove_best_level_refreshes_cached_best_price(self):
+        for order_id, price in [("1", 99), ("2", 100)]:
+            self.order_book._add_bid(Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+                position=Position.LONG, quantity=5, price=price, timestamp=self.timestamp
+            ))
+
+        self.order_book._remove_bid(self.order_book.price_to_ticks(100))
+        self.assertEqual(self.order_book.get_best_bid()[0], 99)
+        self.order_book._remove_bid(self.order_book.price_to_ticks(99))
+        self.assertIsNone(self.order_book.get_best_bid())
+
+    def test_get_spread_follows_removed_levels(self):
+        for order_id, side, position, price in [
+            ("1", OrderSide.BUY, Position.LONG, 98), ("2", OrderSide.BUY, Position.LONG, 99),
+            ("3", OrderSide.SELL, Position.SHORT, 100), ("4", OrderSide.SELL, Position.SHORT, 102),
+        ]:
+            order = Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=side,
+                position=position, quantity=5, price=price, timestamp=self.timestamp
+            )
+            if side is OrderSide.BUY:
+                self.order_book._add_bid(order)
+            else:
+                self.order_book._add_ask(order)
+
+        self.order_book._remove_ask(self.order_book.price_to_ticks(100))
+        self.assertEqual(self.order_book.get_spread(), (102, 99))
+        self.order_book._remove_bid(self.order_book.price_to_ticks(99))
+        self.assertEqual(self.order_book.get_spread(), (102, 98))
+        self.order_book._remove_bid(self.order_book.price_to_ticks(98))
+        self.assertIsNone(self.order_book.get_spread())
+
+    def test_readding_removed_level_reuses_heap_entry(self):
+        def ask(order_id, price):
+            return Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+                position=Position.SHORT, quantity=5, price=price, timestamp=self.timestamp
+            )
+
+        self.order_book._add_ask(ask("1", 100))
+        self.order_book._add_ask(ask("2", 101))
+        self.order_book._remove_ask(self.order_book.price_to_ticks(101))
+        self.order_book._add_ask(ask("3", 101))
+        self.order_book._remove_ask(self.order_book.price_to_ticks(100))
+
+        self.assertEqual(self.order_book.get_best_ask()[0], 101)
+        self.assertEqual(self.order_book._ask_heap, [self.order_book.price_to_ticks(101)])
+        self.assertEqual(self.order_book._ask_tombstones, set())
+
+    def test_heap_is_compacted_when_tombstones_outnumber_levels(self):
+        for order_id, price in [("1", 99), ("2", 100), ("3", 101)]:
+            self.order_book._add_ask(Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+                position=Position.SHORT, quantity=5, price=price, timestamp=self.timestamp
+            ))
+
+        self.order_book._remove_ask(self.order_book.price_to_ticks(101))
+        self.assertEqual(self.order_book._ask_tombstones, {self.order_book.price_to_ticks(101)})
+        self.order_book._remove_ask(self.order_book.price_to_ticks(100))
+
+        self.assertEqual(self.order_book._ask_heap, [self.order_book.price_to_ticks(99)])
+        self.assertEqual(self.order_book._ask_tombstones, set())
+        self.assertEqual(self.order_book.get_best_ask()[0], 99)
+
+    def test_removed_levels_are_reused(self):
+        def bid(order_id, price):
+            return Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+                position=Position.LONG, quantity=5, price=price, timestamp=self.timestamp
+            )
+
+        self.order_book._add_bid(bid("1", 100))
+        level = self.order_book.get_best_bid()[1]
+        self.order_book._remove_bid(self.order_book.price_to_ticks(100))
+        self.order_book._add_bid(bid("2", 98))
+
+        self.assertIs(self.order_book.get_best_bid()[1], level)
+        self.assertEqual(level.price, 98)
+        self.assertEqual(level.long_total, 5)
+        self.assertEqual([order.id for order in level.long_orders], ["2"])
+
+    def test_level_pool_is_bounded(self):
+        for ticks in range(200):
+            self.order_book._add_ask(Order(
+                id=str(ticks), symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+                position=Position.SHORT, quantity=1, price=100 + ticks / 100, timestamp=self.timestamp
+            ))
+        self.order_book.match(Order(
+            id="market", symbol="GCQ4", type=OrderType.MARKET, side=OrderSide.BUY,
+            position=Position.LONG, quantity=200, timestamp=self.timestamp
+        ))
+
+        self.assertEqual(self.order_book.asks, {})
+        self.assertEqual(len(self.order_book._level_pool), _LEVEL_POOL_SIZE)
+
+    def test_prices_are_keyed_by_ticks(self):
+        for order_id, price in (("1", 0.1 + 0.2), ("2", 0.3)):
+            self.order_book._add_bid(Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+                position=Position.LONG, quantity=5, price=price, timestamp=self.timestamp
+            ))
+
+        self.assertEqual(list(self.order_book.bids), [30])
+        self.assertEqual(self.order_book.bids[30].long_total, 10)
+        self.order_book._remove_bid(self.order_book.price_to_ticks(0.3))
+        self.assertIsNone(self.order_book.get_best_bid())
+
+    def test_match_from_ring(self):
+        ring = SPSCRing(capacity=4)
+        ring.try_push(Order(
+            id="1", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+            position=Position.SHORT, quantity=5, price=100, timestamp=self.timestamp
+        ))
+        ring.try_push(Order(
+            id="2", symbol="GCQ4", type=OrderType.MARKET, side=OrderSide.BUY,
+            position=Position.LONG, quantity=5, timestamp=self.timestamp
+        ))
+        ring.try_push(Order(
+            id="3", symbol="GCQ4", type=OrderType.MARKET, side=OrderSide.BUY,
+            position=Position.LONG, quantity=5, timestamp=self.timestamp
+        ))
+
+        results = self.order_book.match_from(ring)
+
+        self.assertEqual([(order.id, [o.id for o in matched]) for order, matched in results],
+                         [("1", []), ("2", ["1"]), ("3", [])])
+        self.assertEqual(len(ring), 0)
+
+    def test_match_batch(self):
+        orders = np.array([
+            (1, 100.0, 5, 1, OrderSide.SELL, Position.SHORT, OrderType.LIMIT),
+            (2, 101.0, 3, 2, OrderSide.SELL, Position.SHORT, OrderType.LIMIT),
+            (3, 0.0, 6, 3, OrderSide.BUY, Position.LONG, OrderType.MARKET),
+            (4, 99.0, 4, 4, OrderSide.BUY, Position.LONG, OrderType.LIMIT),
+        ], dtype=ORDER_DT)
+
+        filled_ids, filled_qtys, remaining_ids, remaining_qtys = self.order_book.match_batch(orders)
+
+        self.assertEqual(filled_ids.tolist(), [1, 2, 3])
+        self.assertEqual(filled_qtys.tolist(), [5, 1, 6])
+        self.assertEqual(remaining_ids.tolist(), [2, 4])
+        self.assertEqual(remaining_qtys.tolist(), [2, 4])
+        self.assertEqual(self.order_book.get_spread(), (101.0, 99.0))
+        self.assertEqual(self.order_book.asks[self.order_book.price_to_ticks(101)].short_total, 2)
+
+    def test_match_batch_rejects_other_layouts_and_repeated_ids(self):
+        old_layout = np.dtype([("id", "i8"), ("side", "u1"), ("pos", "u1"), ("type", "u1"),
+                               ("price", "f8"), ("qty", "i8"), ("ts", "i8")])
+        with self.assertRaises(ValueError):
+            self.order_book.match_batch(np.zeros(1, dtype=old_layout))
+
+        repeated = np.array([
+            (7, 100.0, 3, 1, OrderSide.SELL, Position.SHORT, OrderType.LIMIT),
+            (7, 101.0, 4, 2, OrderSide.SELL, Position.SHORT, OrderType.LIMIT),
+        ], dtype=ORDER_DT)
+        with self.assertRaises(ValueError):
+            self.order_book.match_batch(repeated)
+        self.assertEqual(self.order_book.asks, {})
+
+        self.order_book.match_batch(repeated[:1])
+        with self.assertRaises(ValueError):
+            self.order_book.match_batch(repeated[1:])
+        self.assertEqual(list(self.order_book.asks), [self.order_book.price_to_ticks(100)])
+
+    def test_match_batch_reports_swept_resting_order(self):
+        orders = np.array([
+            (1, 100.0, 5, 1, OrderSide.SELL, Position.SHORT, OrderType.LIMIT),
+            (2, 0.0, 5, 2, OrderSide.BUY, Position.LONG, OrderType.MARKET),
+        ], dtype=ORDER_DT)
+
+        filled_ids, filled_qtys, remaining_ids, remaining_qtys = self.order_book.match_batch(orders)
+
+        self.assertEqual(filled_ids.tolist(), [1, 2])
+        self.assertEqual(filled_qtys.tolist(), [5, 5])
+        self.assertEqual(remaining_ids.tolist(), [])
+        self.assertEqual(self.order_book.asks, {})
+
+    def test_off_grid_limit_is_never_crossed(self):
+        def limit(order_id, side, position, price):
+            return Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=side,
+                position=position, quantity=5, price=price, timestamp=self.timestamp
+            )
+
+        self.order_book.match(limit("1", OrderSide.SELL, Position.SHORT, 100.01))
+        self.order_book.match(limit("2", OrderSide.BUY, Position.LONG, 99.99))
+        _, buy_matched = self.order_book.match(limit("3", OrderSide.BUY, Position.LONG, 100.006))
+        _, sell_matched = self.order_book.match(limit("4", OrderSide.SELL, Position.SHORT, 100.004))
+
+        self.assertEqual((buy_matched, sell_matched), ([], []))
+        self.assertEqual(self.order_book.get_spread(), (100.01, 100.0))
+        self.assertEqual(list(self.order_book.asks), [10001])
+        self.assertEqual(self.order_book.asks[10001].short_total, 10)
+        self.assertEqual(list(self.order_book.bids), [9999, 10000])
+        self.assertEqual(self.order_book.cancel("3").id, "3")
+        self.assertEqual(self.order_book.cancel("4").id, "4")
+        self.assertEqual(self.order_book.get_spread(), (100.01, 99.99))
+
+    def test_level_price_is_exact_tick_price(self):
+        self.order_book.match(Order(
+            id="1", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+            position=Position.SHORT, quantity=5, price=99.99, timestamp=self.timestamp
+        ))
+        self.order_book.match(Order(
+            id="2", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+            position=Position.LONG, quantity=5, price=0.35, timestamp=self.timestamp
+        ))
+
+        self.assertEqual(self.order_book.get_spread(), (99.99, 0.35))
+        self.assertEqual(repr(self.order_book.get_best_ask()[0]), "99.99")
+
+    def test_orders_walk_past_levels_without_their_queue(self):
+        for order_id, price, position in [("1", 100, Position.LONG), ("2", 101, Position.SHORT)]:
+            self.order_book.match(Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+                position=position, quantity=5, price=price, timestamp=self.timestamp
+            ))
+
+        _, market_matched = self.order_book.match(Order(
+            id="3", symbol="GCQ4", type=OrderType.MARKET, side=OrderSide.BUY,
+            position=Position.LONG, quantity=2, timestamp=self.timestamp
+        ))
+        _, limit_matched = self.order_book.match(Order(
+            id="4", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+            position=Position.LONG, quantity=3, price=102, timestamp=self.timestamp
+        ))
+
+        self.assertEqual([order.id for order in market_matched], ["2"])
+        self.assertEqual([order.id for order in limit_matched], ["2"])
+        self.assertIsNone(self.order_book.get_best_bid())
+        self.assertEqual(list(self.order_book.asks), [self.order_book.price_to_ticks(100)])
+        self.assertEqual(self.order_book.get_best_ask()[0], 100)
+
+    def test_iter_asks_yields_levels_in_price_order(self):
+        for order_id, price in [("1", 105), ("2", 101), ("3", 103), ("4", 102), ("5", 104)]:
+            self.order_book.match(Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+                position=Position.SHORT, quantity=1, price=price, timestamp=self.timestamp
+            ))
+        self.order_book.cancel("4")
+
+        self.assertEqual([ticks for ticks, _ in self.order_book._iter_asks()], [10100, 10300, 10400, 10500])
+
+    def test_cancel_resting_order(self):
+        for order_id, quantity in [("1", 5), ("2", 3)]:
+            self.order_book.match(Order(
+                id=order_id, symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+                position=Position.SHORT, quantity=quantity, price=100, timestamp=self.timestamp
+            ))
+
+        cancelled = self.order_book.cancel("1")
+        _, matched = self.order_book.match(Order(
+            id="3", symbol="GCQ4", type=OrderType.MARKET, side=OrderSide.BUY,
+            position=Position.LONG, quantity=3, timestamp=self.timestamp
+        ))
+
+        self.assertEqual((cancelled.id, cancelled.quantity), ("1", 5))
+        self.assertEqual([order.id for order in matched], ["2"])
+        self.assertIsNone(self.order_book.get_best_ask())
+        self.assertIsNone(self.order_book.cancel("2"))
+        self.assertIsNone(self.order_book.cancel("missing"))
+        self.assertEqual(self.order_book._by_id, {})
+
+    def test_limit_order_with_resting_id_is_rejected(self):
+        def ask(quantity, price):
+            return Order(
+                id="x", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.SELL,
+                position=Position.SHORT, quantity=quantity, price=price, timestamp=self.timestamp
+            )
+
+        self.order_book.match(ask(5, 100))
+        with self.assertRaises(ValueError):
+            self.order_book.match(ask(3, 101))
+
+        self.assertEqual(list(self.order_book.asks), [self.order_book.price_to_ticks(100)])
+        self.assertEqual(self.order_book.cancel("x").quantity, 5)
+        self.assertIsNone(self.order_book.get_best_ask())
+        self.order_book.match(ask(3, 101))
+        self.assertEqual(self.order_book.get_best_ask()[0], 101)
+
+    def test_cancel_last_order_removes_level(self):
+        self.order_book.match(Order(
+            id="1", symbol="GCQ4", type=OrderType.LIMIT, side=OrderSide.BUY,
+            position=Position.LONG, quantity=5, price=99, timestamp=self.timestamp
+        ))
+
+        self.assertEqual(self.order_book.cancel("1").id, "1")
+        self.assertIsNone(self.order_book.get_best_bid())
+        self.assertNotIn(self.order_book.price_to_ticks(99), self.order_book.bids)
+
@@ -1,12 +1,15 @@
+import time
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from src.order_book_engine.models.order import Order, OrderType, OrderSide, Position
+import numpy as np
+
+from src.order_book_engine.models.order import Order, OrderType, OrderSide, Position, datetime_to_ns, ORDER_DT
 
 
 class TestOrder(unittest.TestCase):
    def setUp(self):
-       self.timestamp = datetime.now()
+       self.timestamp = time.time_ns()
        self.symbol = "GCQ4"
 
    def test_market_order_creation(self):
@@ -61,5 +64,80 @@ class TestOrder(unittest.TestCase):
        self.assertIn(order.side, OrderSide)
        self.assertIn(order.position, Position)
 
+   def test_order_uses_slots(self):
+       order = Order(
+           id="5",
+           symbol=self.symbol,
+           type=OrderType.MARKET,
+           side=OrderSide.BUY,
+           position=Position.LONG,
+           quantity=100,
+           timestamp=self.timestamp
+       )
+       self.assertFalse(hasattr(order, "__dict__"))
+       with self.assertRaises(AttributeError):
+           order.unknown = 1
+
+   def test_positional_arguments_keep_public_order(self):
+       order = Order("6", self.symbol, OrderType.LIMIT, OrderSide.SELL, Position.SHORT, 7, self.timestamp, 10.5)
+       self.assertEqual((order.id, order.symbol, order.quantity, order.price), ("6", self.symbol, 7, 10.5))
+       self.assertEqual(Order.__slots__[:3], ("quantity", "side", "position"))
+
+   def test_match_args_and_repr_keep_public_order(self):
+       order = Order("6", self.symbol, OrderType.LIMIT, OrderSide.SELL, Position.SHORT, 7, 1, 10.5)
+       match order:
+           case Order(order_id, symbol, order_type, side, position, quantity, timestamp, price):
+               matched = (order_id, symbol, order_type, side, position, quantity, timestamp, price)
+       self.assertEqual(matched, ("6", self.symbol, OrderType.LIMIT, OrderSide.SELL, Position.SHORT, 7, 1, 10.5))
+       self.assertTrue(repr(order).startswith("Order(id='6', symbol='GCQ4', type=<OrderType.LIMIT: 0>"))
+
+   def test_datetime_timestamp_is_stored_as_nanoseconds(self):
+       now = datetime.now()
+       order = Order("7", self.symbol, OrderType.MARKET, OrderSide.BUY, Position.LONG, 1, now)
+       later = Order("8", self.symbol, OrderType.MARKET, OrderSide.BUY, Position.LONG, 1,
+                     now + timedelta(microseconds=1))
+
+       self.assertIsInstance(order.timestamp, int)
+       self.assertEqual(order.timestamp, datetime_to_ns(now))
+       self.assertEqual(later.timestamp - order.timestamp, 1_000)
+
+   def test_integer_timestamp_is_kept(self):
+       order = Order("9", self.symbol, OrderType.MARKET, OrderSide.BUY, Position.LONG, 1, 1_700_000_000_000_000_000)
+       self.assertEqual(order.timestamp, 1_700_000_000_000_000_000)
+
+   def test_enums_are_plain_integers(self):
+       self.assertEqual([int(member) for member in OrderType], [0, 1])
+       self.assertEqual([int(member) for member in OrderSide], [0, 1])
+       self.assertEqual([int(member) for member in Position], [0, 1])
+       self.assertEqual(OrderSide.SELL | (Position.SHORT << 1), 3)
+       self.assertTrue(all(isinstance(member, int) for member in (*OrderType, *OrderSide, *Position)))
+
+   def test_missing_timestamp_defaults_to_current_time(self):
+       before = time.time_ns()
+       order = Order("10", self.symbol, OrderType.MARKET, OrderSide.BUY, Position.LONG, 1)
+       self.assertLessEqual(before, order.timestamp)
+       self.assertLessEqual(order.timestamp, time.time_ns())
+
+   def test_order_records_are_aligned(self):
+       self.assertEqual(ORDER_DT.itemsize, 40)
+       self.assertTrue(ORDER_DT.isalignedstruct)
+       self.assertEqual(ORDER_DT.fields["ts"][1] % 8, 0)
+
+   def test_from_record(self):
+       records = np.array([
+           (11, 10.5, 7, 123, OrderSide.SELL, Position.SHORT, OrderType.LIMIT),
+           (12, 0.0, 3, 456, OrderSide.BUY, Position.LONG, OrderType.MARKET),
+       ], dtype=ORDER_DT)
+
+       limit_order = Order.from_record(records[0], self.symbol)
+       market_order = Order.from_record(records[1], self.symbol)
+
+       self.assertEqual((limit_order.id, limit_order.symbol, limit_order.quantity, limit_order.price, limit_order.timestamp),
+                        ("11", self.symbol, 7, 10.5, 123))
+       self.assertIs(limit_order.side, OrderSide.SELL)
+       self.assertIs(limit_order.position, Position.SHORT)
+       self.assertIs(market_order.type, OrderType.MARKET)
+       self.assertIsNone(market_order.price)
+
 if __name__ == '__main__':
    unittest.main()
\ No newline at end of file
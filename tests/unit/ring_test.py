@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+
+from src.order_book_engine.utils.ring import SPSCRing
+
+
+class TestSPSCRing(unittest.TestCase):
+    def setUp(self):
+        self.ring = SPSCRing(capacity=4)
+
+    def test_capacity_must_be_power_of_two(self):
+        with self.assertRaises(ValueError):
+            SPSCRing(capacity=3)
+
+    def test_push_pop_fifo(self):
+        for item in range(3):
+            self.assertTrue(self.ring.try_push(item))
+
+        self.assertEqual(len(self.ring), 3)
+        self.assertEqual([self.ring.try_pop() for _ in range(3)], [0, 1, 2])
+        self.assertIsNone(self.ring.try_pop())
+
+    def test_push_on_full_ring(self):
+        for item in range(4):
+            self.assertTrue(self.ring.try_push(item))
+        self.assertFalse(self.ring.try_push(4))
+
+        self.assertEqual(self.ring.try_pop(), 0)
+        self.assertTrue(self.ring.try_push(4))
+        self.assertEqual([self.ring.try_pop() for _ in range(4)], [1, 2, 3, 4])
+
+    def test_producer_and_consumer_threads(self):
+        ring = SPSCRing(capacity=64)
+        items = list(range(1_000))
+        received = []
+
+        def produce():
+            for item in items:
+                while not ring.try_push(item):
+                    time.sleep(0)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        while len(received) < len(items):
+            item = ring.try_pop()
+            if item is None:
+                time.sleep(0)
+            else:
+                received.append(item)
+        producer.join()
+
+        self.assertEqual(received, items)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,16 @@
+import time
 import unittest
-from datetime import datetime
+from itertools import product
+
+import numpy as np
 
 from src.order_book_engine.models.order import OrderType, Order, OrderSide, Position
-from src.order_book_engine.utils.match import is_valid_match
+from src.order_book_engine.utils.match import is_valid_match, are_valid_matches
 
 
 class TestMatching(unittest.TestCase):
    def setUp(self):
-       self.timestamp = datetime.now()
+       self.timestamp = time.time_ns()
        self.order_params = {
            "id": "1",
            "symbol": "GCQ4",
@@ -30,4 +33,25 @@ class TestMatching(unittest.TestCase):
    def test_invalid_match(self):
        order1 = Order(**self.order_params, side=OrderSide.BUY, position=Position.LONG)
        order2 = Order(**self.order_params, side=OrderSide.BUY, position=Position.SHORT)
-       self.assertFalse(is_valid_match(order1, order2))
\ No newline at end of file
+       self.assertFalse(is_valid_match(order1, order2))
+
+   def test_same_position_is_invalid_match(self):
+       order1 = Order(**self.order_params, side=OrderSide.BUY, position=Position.LONG)
+       order2 = Order(**self.order_params, side=OrderSide.SELL, position=Position.LONG)
+       self.assertFalse(is_valid_match(order1, order2))
+
+   def test_all_combinations_match_opposite_side_and_position(self):
+       for side1, position1, side2, position2 in product(OrderSide, Position, OrderSide, Position):
+           order1 = Order(**self.order_params, side=side1, position=position1)
+           order2 = Order(**self.order_params, side=side2, position=position2)
+           expected = side1 is not side2 and position1 is not position2
+           self.assertEqual(is_valid_match(order1, order2), expected)
+
+   def test_are_valid_matches_agrees_with_is_valid_match(self):
+       candidates = list(product(OrderSide, Position))
+       sides = np.array([side for side, _ in candidates], dtype=np.int8)
+       positions = np.array([position for _, position in candidates], dtype=np.int8)
+       for side, position in candidates:
+           order = Order(**self.order_params, side=side, position=position)
+           expected = [is_valid_match(order, Order(**self.order_params, side=s, position=p)) for s, p in candidates]
+           self.assertEqual(are_valid_matches(side, position, sides, positions).tolist(), expected)